@@ -1,45 +1,73 @@
 import time
 import os
-from src.acroHandlers import acroDictHandler
+import multiprocessing
+from src.acroHandlers import acroDictHandler, acroDbSqliteHandler
+from src.common import defines as dv
 from src.common import configVars as cv
-from src.docxHandlers import docxExporter, docxReader
+from src.docxHandlers import docxExporter, docxReader, docxStreamReader, docxBatchReader
 from src.cmdInterface import userCmdHandler, ansiColorHelper as ach
 from src.initScripts import argvHandler
 
-# 0. Configure environment and get input arguments if launched from word macro
-time_begin_acronymate = time.monotonic()
-ach.enable_ansi_in_windows_cmd()
-obj_argv = argvHandler.ArgvHandler()
-
-# 1. Initialization
-userCmdHandler.print_logo()
-userCmdHandler.load_config_data()
-acro_dict_handler = acroDictHandler.AcroDictHandler()
-
-# 2. Get docx file and process it
-if obj_argv.input_path == "":
-    docx_input_path = userCmdHandler.get_docx_filepath_from_user(acro_dict_handler)
-else:
-    docx_input_path = obj_argv.input_path
-docx_reader = docxReader.DocxReader(acro_dict_handler)
-docx_reader.extract_acro_word(docx_input_path, obj_argv.filename)
-
-# 3. Present the user the acronyms found
-userCmdHandler.process_acro_found(acro_dict_handler, obj_argv.mode)
-acro_dict_handler.mark_acro_output_as_used()
-
-# 4. Save changes and generate output document
-userCmdHandler.handle_db_save(acro_dict_handler)
-
-obj_docx_exporter = docxExporter.DocxExporter(acro_dict_handler)
-obj_output_doc = obj_docx_exporter.generate_output_docx(time_begin_acronymate)
-docx_export_filename = "Acronyms_" + acro_dict_handler.str_file_open
-if docx_export_filename[-5:] != ".docx":
-    docx_export_filename += ".docx"
-str_docx_exported_path = userCmdHandler.save_file(
-    cv.config_docx_export_folder, docx_export_filename, cv.config_allow_overwriting_exported,
-    docxExporter.save_document, obj_output_doc)
-
-# 5. Open in word the generated document
-if cv.config_open_docx_after_export:
-    os.system('start "Title" "' + str_docx_exported_path + '"')
+
+def main():
+    # 0. Configure environment and get input arguments if launched from word macro
+    time_begin_acronymate = time.monotonic()
+    ach.enable_ansi_in_windows_cmd()
+    obj_argv = argvHandler.ArgvHandler()
+
+    # 1. Initialization
+    userCmdHandler.print_logo()
+    userCmdHandler.load_config_data()
+    if obj_argv.engine:
+        cv.config_reader_engine = obj_argv.engine
+    if obj_argv.db_convert is not None:  # One-shot conversion of a DB file, nothing else is done
+        acroDbSqliteHandler.convert_db(*obj_argv.db_convert)
+        userCmdHandler.print_db_converted(obj_argv.db_convert[1])
+        exit(0)
+    acro_dict_handler = acroDictHandler.AcroDictHandler(flag_background_load=cv.config_load_db_in_background)
+
+    # 2. Get docx file and process it. In batch mode all the files are processed in parallel
+    if obj_argv.batch_path != "":
+        if docxBatchReader.extract_acro_batch(acro_dict_handler, obj_argv.batch_path, obj_argv.jobs) == 0:
+            if docxBatchReader.get_batch_filepaths(obj_argv.batch_path):
+                userCmdHandler.print_batch_all_files_failed_error(obj_argv.batch_path)
+            else:
+                userCmdHandler.print_batch_no_files_error(obj_argv.batch_path)
+            exit(-1)
+    else:
+        if obj_argv.input_path == "":
+            docx_input_path = userCmdHandler.get_docx_filepath_from_user(acro_dict_handler)
+        else:
+            docx_input_path = obj_argv.input_path
+        if cv.config_reader_engine == dv.define_reader_engine_stream:
+            docx_reader = docxStreamReader.DocxStreamReader(acro_dict_handler)
+        else:
+            docx_reader = docxReader.DocxReader(acro_dict_handler)
+        docx_reader.extract_acro_word(docx_input_path, obj_argv.filename)
+
+    # 3. Present the user the acronyms found
+    userCmdHandler.process_acro_found(acro_dict_handler, obj_argv.mode)
+    acro_dict_handler.mark_acro_output_as_used()
+
+    # 4. Save changes and generate output document
+    userCmdHandler.handle_db_save(acro_dict_handler)
+
+    obj_docx_exporter = docxExporter.DocxExporter(acro_dict_handler)
+    obj_output_doc = obj_docx_exporter.generate_output_docx(time_begin_acronymate)
+    docx_export_filename = "Acronyms_" + acro_dict_handler.str_file_open
+    if docx_export_filename[-5:] != ".docx":
+        docx_export_filename += ".docx"
+    str_docx_exported_path = userCmdHandler.save_file(
+        cv.config_docx_export_folder, docx_export_filename, cv.config_allow_overwriting_exported,
+        docxExporter.save_document, obj_output_doc)
+
+    # 5. Open in word the generated document
+    if cv.config_open_docx_after_export:
+        os.system('start "Title" "' + str_docx_exported_path + '"')
+
+
+# The batch workers can be spawned instead of forked (Windows, frozen executables). They import this script again, so
+# the program only runs in the main process
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    main()
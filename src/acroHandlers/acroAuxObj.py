@@ -26,6 +26,15 @@ class AcroAuxObj:
             self.proposed_def = self.def_list_db
             self.flag_update_db = False
 
+        # Look acronyms written differently (Accents, capitalization, points or plural. Ej: ESAs and ESA). DB ones
+        # first. Their definitions are only shown, see use_similar_defs
+        self.dict_similar_defs = dict()
+        for acro_similar in self.dict_handler.obj_db.search_similar_acros_in_db(self.acro):
+            self.dict_similar_defs[acro_similar] = self.dict_handler.obj_db.search_def_in_db(acro_similar)
+        for acro_similar in self.dict_handler.search_similar_acros_in_doc_table(self.acro):
+            if acro_similar not in self.dict_similar_defs:
+                self.dict_similar_defs[acro_similar] = self.dict_handler.search_def_in_doc_table(acro_similar)
+
         # Fill the selected list
         self.selected_def = []
         for _ in range(len(self.proposed_def)):
@@ -38,6 +47,20 @@ class AcroAuxObj:
             flag_return = True
         return flag_return
 
+    def has_only_similar_defs(self):
+        """Returns True if the acronym has no definitions, but a similar acronym has"""
+        return len(self.def_list_db) == 0 and len(self.def_list_doc_table) == 0 and len(self.dict_similar_defs) > 0
+
+    def use_similar_defs(self, acro_similar):
+        """Proposes the definitions of a similar acronym. Only used if the user accepts them, they can be wrong (Ej:
+        VER and Ver.)
+
+        :param acro_similar: Acronym of dict_similar_defs
+        """
+        # Copied, the edits must not change the similar acronym
+        self.proposed_def = [dict(definition) for definition in self.dict_similar_defs[acro_similar]]
+        self.selected_def = [True] * len(self.proposed_def)
+
     def is_in_db(self):
         """Returns True if acronym is in database"""
         flag_return = False
@@ -50,8 +73,8 @@ class AcroAuxObj:
         return self.dict_handler.obj_db.is_blacklisted(self.acro)
 
     def toggle_blacklisted_status(self):
-        """Toggles blacklist status in the db"""
-        self.dict_handler.obj_db.toggle_in_blacklist(self.acro)
+        """Toggles blacklist status in the db. Returns False if it is blacklisted by a read-only DB layer"""
+        return self.dict_handler.obj_db.toggle_in_blacklist(self.acro)
 
     def defs_discrepancy(self):
         """Returns True if db definition does not match with the acronym table one. As this means that the acro could
@@ -165,7 +188,8 @@ class AcroAuxObj:
         """Removes acro from the output list"""
         self.dict_handler.remove_acro_output(self.acro)
 
-    def get_str_pretty_definition_list(self, def_list):
+    @staticmethod
+    def get_str_pretty_definition_list(def_list):
         """Return formatted string with all definition ordered"""
         str_out = ""
         if len(def_list):
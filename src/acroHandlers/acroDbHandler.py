@@ -1,28 +1,93 @@
+import os
+import gc
+import sys
+import copy
+import gzip
+import lzma
 import json
+import pickle
+import hashlib
 import re
 from datetime import datetime
 from pathlib import Path
 from src.common import defines as dv
 from src.common import configVars as cv
+from src.common import pathHelpers
+from src.common import stringHelpers as strHlprs
+from src.acroHandlers import acroSpecialMatcher
 from src.cmdInterface import userCmdHandler
 
 
+class AcroDbRecord:
+    """Compact record of one DB acronym. The dates and filenames repeat along the DB, they are interned so all the
+    records share the same string objects. Serialized with the JSON DB layout by to_dict"""
+    __slots__ = ('defs', 'creation', 'last_edit', 'last_uses')
+
+    def __init__(self, defs, creation="", last_edit="", last_uses=()):
+        self.defs = defs                        # Definition list. Each definition is a dict with Main and Translation
+        self.creation = sys.intern(creation)    # Date string
+        self.last_edit = sys.intern(last_edit)  # Date string
+        self.last_uses = [(sys.intern(str_file), sys.intern(str_date)) for str_file, str_date in last_uses]
+
+    def __eq__(self, other):
+        if not isinstance(other, AcroDbRecord):
+            return NotImplemented
+        return (self.defs, self.creation, self.last_edit, self.last_uses) == \
+            (other.defs, other.creation, other.last_edit, other.last_uses)
+
+    __hash__ = None  # Mutable
+
+    @classmethod
+    def from_dict(cls, acro_data):
+        """Returns the record of an acronym data dict with the JSON DB layout. Missing labels get the empty values"""
+        dict_properties = acro_data.get('Properties', dict())
+        return cls(acro_data.get('Def', [{'Main': ""}]), dict_properties.get('Creation', ""),
+                   dict_properties.get('Last_edit', ""), dict_properties.get('Last_uses', []))
+
+    def to_dict(self):
+        """Returns the acronym data dict with the JSON DB layout"""
+        return {'Def': self.defs, 'Properties': {'Creation': self.creation, 'Last_edit': self.last_edit,
+                                                 'Last_uses': [list(last_use) for last_use in self.last_uses]}}
+
+
 class AcroDbHandler:
     """Class to handle the acronym data base"""
-    def __init__(self):
+    def __init__(self, flag_load=True, flag_read_only=False):
+        """Class constructor
+
+        :param flag_load: If False the DB file is not loaded. Used by the batch workers, which only need the special
+        acronyms of the DB
+        :param flag_read_only: If True the DB is only a layer of other DB (See set_db_layers). It is never saved, so its
+        file bytes are not kept for the backups
+        """
         self.str_curr_date = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
         self.str_prev_date = ""
+        self.str_snapshot_date = ""  # Date of the DB file, without the changes of its journal
+        self.str_db_path = cv.config_acro_db_path  # DB file loaded
+        self.db_fingerprint = (None, None)  # Size and modification time of the DB file and its journal when loaded
+        self.str_db_hash = ""  # Hash of the DB file content when loaded
 
-        self.acros_db = dict()      # Acronyms from the DB. Helper reference
-        self.full_db = dict()       # Full DB object. Includes acronyms and administration data
-        self.full_db_ori = dict()   # Copy of the full DB object for backup
+        self.acros_db = dict()      # Acronyms from the DB, as AcroDbRecord objects. Helper reference
+        self.full_db = dict()       # Full DB object. Includes acronyms, blacklist set and administration data
+        self.bytes_db_ori = b"{}"   # Bytes of the DB file as read, for the backup. Empty DB if the file is not found
+        self.bytes_journal_ori = b""  # Bytes of the DB journal as read, for the backup
         self.log_db_changes = {'Added': [], 'Modified': [], 'Deleted': []}
+        self.set_changed = set()            # Acronyms added or modified since the load
+        self.set_last_use_changed = set()   # Acronyms with new last uses. Only saved along with other changes
+        self.set_deleted = set()            # Acronyms deleted since the load
+        self.set_blacklist_changed = set()  # Acronyms toggled in the blacklist since the load
+        self.dict_base_records = dict()     # Data of the changed acronyms as loaded. None if not in the DB
+        self.dict_acro_keys = dict()  # Normalized key (See get_acro_key) -> set of acronyms. Finds similar acronyms
         self.list_no_regex = []  # Todo: Convert to iterable object?
+        self.special_acro_matcher = acroSpecialMatcher.AcroSpecialMatcher()  # Matcher for the list_no_regex acronyms
+        self.list_db_layers = []  # Read-only DBs searched after this one, in priority order. See set_db_layers
+        self.flag_read_only = flag_read_only
 
         self.needs_save = True  # Some processing modes does not change the DB files and saving can be avoided
 
         # Load DB after object creation
-        self.load_acros_db()
+        if flag_load:
+            self.load_acros_db()
 
     def add_db_last_use(self, acro_in, str_last_use_file):
         """Updates the ['Last_uses'] information of acronym to add the current docx file in use
@@ -30,72 +95,298 @@ class AcroDbHandler:
         :param acro_in: Acronym to be updated
         """
         if acro_in in self.full_db['Acronyms']:
-            list_last_uses = self.full_db['Acronyms'][acro_in]['Properties']['Last_uses']
-            list_last_uses.append((str_last_use_file, self.str_curr_date))
+            self.__store_base_record(acro_in)
+            list_last_uses = self.full_db['Acronyms'][acro_in].last_uses
+            list_last_uses.append((sys.intern(str_last_use_file), sys.intern(self.str_curr_date)))
             while len(list_last_uses) > 5:
                 list_last_uses.pop(0)
+            self.set_last_use_changed.add(acro_in)
+
+    def __store_base_record(self, acro_in):
+        """Stores the data of an acronym before its first change, used to merge with changes saved by other users"""
+        if acro_in not in self.dict_base_records:
+            self.dict_base_records[acro_in] = copy.deepcopy(self.acros_db.get(acro_in))
 
     def search_def_in_db(self, acro_in):
-        """Searches for an acronym in the acronym-database dictionary and returns its definition"""
+        """Searches for an acronym in the acronym-database dictionary and returns its definition. If it is not found,
+        it is searched in the DB layers"""
         definition_list_out = []
         if acro_in in self.acros_db:
-            definition_list_out = self.acros_db[acro_in]['Def']
+            definition_list_out = self.acros_db[acro_in].defs
+        else:
+            for obj_db_layer in self.list_db_layers:
+                definition_list_out = obj_db_layer.search_def_in_db(acro_in)
+                if definition_list_out:
+                    # Copied, the layer is not changed when the definitions are edited. They are saved to this DB
+                    definition_list_out = [dict(definition) for definition in definition_list_out]
+                    break
         return definition_list_out
 
+    def search_similar_acros_in_db(self, acro_in):
+        """Returns the DB acronyms written as acro_in except for accents, capitalization, points or plural (Ej: ESAs and
+        ESA). The acronym itself is not included
+
+        :param acro_in: Acronym
+        :return: Sorted list of acronyms
+        """
+        str_key = strHlprs.get_acro_key(acro_in)
+        set_similar = self.dict_acro_keys.get(str_key, set()).union(
+            *(obj_db_layer.dict_acro_keys.get(str_key, set()) for obj_db_layer in self.list_db_layers))
+        return sorted(set_similar - {acro_in})
+
+    def _build_acro_key_index(self, iter_acros):
+        """Builds the index of the DB acronyms by their normalized key. Then it is updated with each acronym added or
+        deleted"""
+        self.dict_acro_keys = dict()
+        for acro in iter_acros:
+            self._add_to_acro_key_index(acro)
+
+    def _add_to_acro_key_index(self, acro_in):
+        """Adds an acronym to the normalized key index"""
+        str_key = strHlprs.get_acro_key(acro_in)
+        if str_key != "":
+            self.dict_acro_keys.setdefault(str_key, set()).add(acro_in)
+
+    def _remove_from_acro_key_index(self, acro_in):
+        """Removes an acronym from the normalized key index"""
+        str_key = strHlprs.get_acro_key(acro_in)
+        if str_key in self.dict_acro_keys:
+            self.dict_acro_keys[str_key].discard(acro_in)
+            if not self.dict_acro_keys[str_key]:
+                del self.dict_acro_keys[str_key]
+
     def delete_acro_in_db(self, acro_in):
-        """Deletes an acronym from the database. This includes all definitions. Returns True if successful"""
+        """Deletes an acronym from the database. This includes all definitions. Returns True if successful. Acronyms of
+        the DB layers can not be deleted"""
         flag_return = False
         if acro_in in self.acros_db:
+            self.__store_base_record(acro_in)
             del self.acros_db[acro_in]
+            self._remove_from_acro_key_index(acro_in)
             self.log_db_changes['Deleted'].append(acro_in)
+            self.set_deleted.add(acro_in)
+            self.set_changed.discard(acro_in)
             flag_return = True
         return flag_return
 
     def update_acro_in_db(self, acro_in, def_list_in):
         """Updates or adds an acronym definition on the database"""
+        self.__store_base_record(acro_in)
         if acro_in not in self.acros_db:
-            self.acros_db[acro_in] = {'Def': [], 'Properties': {'Creation': "", 'Last_edit': "", 'Last_uses': []}}
+            self.acros_db[acro_in] = AcroDbRecord([], self.str_curr_date)
+            self._add_to_acro_key_index(acro_in)
             self.log_db_changes['Added'].append(acro_in)
-            self.acros_db[acro_in]['Properties']['Creation'] = self.str_curr_date
         else:
             self.log_db_changes['Modified'].append(acro_in)
-        self.acros_db[acro_in]['Def'] = def_list_in
-        self.acros_db[acro_in]['Properties']['Last_edit'] = self.str_curr_date
+        self.acros_db[acro_in].defs = def_list_in
+        self.acros_db[acro_in].last_edit = sys.intern(self.str_curr_date)
+        self.set_deleted.discard(acro_in)
+        self.set_changed.add(acro_in)
 
     def is_blacklisted(self, acro_in):
-        """Returns True if acronym is in the blacklist"""
+        """Returns True if acronym is in the blacklist of the DB or of one of its layers"""
+        return self._is_in_own_blacklist(acro_in) or \
+            any(obj_db_layer.is_blacklisted(acro_in) for obj_db_layer in self.list_db_layers)
+
+    def _is_in_own_blacklist(self, acro_in):
+        """Returns True if acronym is in the blacklist of this DB, without its layers"""
         return acro_in in self.full_db['Blacklist']
 
-    def toggle_in_blacklist(self, acro_in):
-        """Toggles the acronym blacklist status"""
-        if self.is_blacklisted(acro_in):
-            idx_found = -1
-            for i, bl_entry in enumerate(self.full_db['Blacklist']):
-                if bl_entry == acro_in:
-                    idx_found = i
-                    break
-            self.full_db['Blacklist'].pop(idx_found)
+    def _set_in_own_blacklist(self, acro_in, flag_blacklisted):
+        """Adds or removes an acronym from the blacklist of this DB"""
+        if flag_blacklisted:
+            self.full_db['Blacklist'].add(acro_in)
         else:
-            self.full_db['Blacklist'].append(acro_in)
+            self.full_db['Blacklist'].discard(acro_in)
+
+    def toggle_in_blacklist(self, acro_in):
+        """Toggles the acronym blacklist status. Acronyms blacklisted by a DB layer can not be removed from it
+
+        :return: False if the status can not be changed
+        """
+        if not self._is_in_own_blacklist(acro_in) and self.is_blacklisted(acro_in):
+            return False
+        self._set_in_own_blacklist(acro_in, not self._is_in_own_blacklist(acro_in))
+        self.set_blacklist_changed.symmetric_difference_update({acro_in})
+        return True
+
+    def is_dirty(self):
+        """Returns True if the DB has changes to be saved. New last uses alone do not need a save"""
+        return bool(self.set_changed or self.set_deleted or self.set_blacklist_changed)
+
+    def _include_last_use_changes(self):
+        """Adds the acronyms with new last uses to the changed ones. Called when the DB is going to be saved"""
+        self.set_changed |= self.set_last_use_changed - self.set_deleted
+        self.set_last_use_changed = set()
 
     def save_db(self, path_output):
-        """Saves the database dictionary to a .json file. It also completes the admin data values before saving
+        """Saves the database dictionary to a .json file. It also completes the admin data values before saving.
+
+        If the output is the DB file, only the changes are appended to its journal. The full file is written again
+        (Compaction) when the journal gets too big
 
         :param path_output: Desired file output path
         """
+        self._include_last_use_changes()
         # Date with microseconds. Used to know if someone has saved before
-        self.__set_admin_data_in_db()
+        self._set_admin_data_in_db()
+        flag_db_file = Path(path_output).resolve() == Path(self.str_db_path).resolve()
+        if flag_db_file and cv.config_use_db_journal and self.__append_to_journal():
+            return
         with open(path_output, 'w', encoding="utf-8") as db_file:
-            json.dump(self.full_db, db_file, ensure_ascii=False, sort_keys=True, indent=2)
+            db_file.write(dumps_db(self.full_db))
+        if flag_db_file:  # The journal changes are now in the DB file
+            get_journal_path(self.str_db_path).unlink(missing_ok=True)
+            self.str_snapshot_date = self.full_db['Admin_data']['Date']
+
+    def __append_to_journal(self):
+        """Appends the DB changes to the journal of the DB file. Each change is a json list in one line
+
+        :return: False if the DB file has to be written instead
+        """
+        if not Path(self.str_db_path).exists():
+            return False
+        path_journal = get_journal_path(self.str_db_path)
+        list_records = [["Delete", acro] for acro in sorted(self.set_deleted)]
+        list_records += [["Set", acro, self.acros_db[acro].to_dict()] for acro in sorted(self.set_changed)]
+        list_records += [["Blacklist", acro, self._is_in_own_blacklist(acro)] for acro in sorted(self.set_blacklist_changed)]
+        list_records.append(["Admin_data", self.full_db['Admin_data']])
+        str_records = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in list_records)
+
+        journal_size = 0
+        if path_journal.exists():
+            # Journals of other DB file version (Ej: written again by an older program version) or with an incomplete
+            # last line are not continued
+            if self.__read_journal(path_journal)[:1] != [["Snapshot", self.str_snapshot_date]] or \
+                    path_journal.read_bytes()[-1:] != b'\n':
+                return False
+            journal_size = path_journal.stat().st_size
+        else:
+            str_records = json.dumps(["Snapshot", self.str_snapshot_date], ensure_ascii=False) + '\n' + str_records
+        if journal_size + len(str_records) > cv.config_db_journal_max_size_kb * 1024:
+            return False
+        with open(path_journal, 'a', encoding="utf-8") as journal_file:
+            journal_file.write(str_records)
+        return True
+
+    @staticmethod
+    def __read_journal(path_journal):
+        """Returns the records of a DB journal. A line not complete (Ej: the program was closed while writing) ends it
+
+        :param path_journal: Path object to the journal file
+        :return: List of records. The first one is the date of the DB file the journal applies to
+        """
+        list_records = []
+        try:
+            with open(path_journal, 'r', encoding="utf-8") as journal_file:
+                for str_line in journal_file:
+                    list_records.append(json.loads(str_line))
+        except (OSError, ValueError):
+            pass
+        return list_records
+
+    def __replay_journal(self, db_file_path):
+        """Applies the changes of the journal of the DB file to the loaded DB"""
+        path_journal = get_journal_path(db_file_path)
+        list_records = self.__read_journal(path_journal)
+        if list_records[:1] != [["Snapshot", self.str_snapshot_date]]:
+            return  # No journal, or it belongs to other version of the DB file
+        for record in list_records[1:]:
+            if record[0] == "Set":
+                self.full_db['Acronyms'][record[1]] = AcroDbRecord.from_dict(record[2])
+            elif record[0] == "Delete":
+                self.full_db['Acronyms'].pop(record[1], None)
+            elif record[0] == "Blacklist":
+                if record[2]:
+                    self.full_db['Blacklist'].add(record[1])
+                else:
+                    self.full_db['Blacklist'].discard(record[1])
+            elif record[0] == "Admin_data":
+                self.full_db['Admin_data'] = record[1]
+                self.str_prev_date = record[1]['Date']
+        if cv.config_save_backups and not self.flag_read_only:
+            self.bytes_journal_ori = path_journal.read_bytes()
 
     def save_db_backup(self, path_output):
-        """Saves the original read DB file as a non indented .json
+        """Saves the original read DB file. The bytes read are written as they are, compressed as configured
 
-        :param path_output: Desired file output path
+        :param path_output: Desired file output path, with the compression extension
         """
-        # Backup is not indented to save space. It will get pretty when used again
-        with open(path_output, 'w', encoding="utf-8") as db_file:
-            json.dump(self.full_db_ori, db_file, ensure_ascii=False, sort_keys=True)
+        write_backup(path_output, self.bytes_db_ori)
+        # The journal is kept next to the backup, it is applied if the backup is loaded
+        str_ext = dv.define_backup_compression_ext_dict[cv.config_backup_compression]
+        path_journal = Path(str(get_journal_path(str(path_output)[:len(str(path_output)) - len(str_ext)])) + str_ext)
+        if self.bytes_journal_ori:
+            write_backup(path_journal, self.bytes_journal_ori)
+        else:  # Journal of a previous backup of the same day
+            path_journal.unlink(missing_ok=True)
+
+    def save_db_backup_snapshot(self, path_output):
+        """Saves the original read DB file, without its journal. Used by the delta backups, once for each DB file
+        version
+
+        :param path_output: Desired file output path, with the compression extension
+        """
+        write_backup(path_output, self.bytes_db_ori)
+
+    def save_db_backup_delta(self, path_output):
+        """Saves the original read journal of the DB file: the changes since the DB file was written. Used by the delta
+        backups, it is applied to their snapshot
+
+        :param path_output: Desired file output path, with the compression extension
+        """
+        bytes_journal = self.bytes_journal_ori
+        if not bytes_journal:  # Only the header. The backup is the snapshot as it is
+            bytes_journal = json.dumps(["Snapshot", self.str_snapshot_date], ensure_ascii=False).encode("utf-8") + b'\n'
+        write_backup(path_output, bytes_journal)
+
+    @staticmethod
+    def prune_backups(bak_folder, str_db_name):
+        """Removes the backups of a DB not kept by the retention policy: the backups of the last
+        config_backups_keep_daily days, and the newest backup of each of the last config_backups_keep_weekly weeks.
+        Snapshots are kept while a delta backup kept uses them. The folder is only listed once
+
+        :param bak_folder: Backup folder
+        :param str_db_name: DB filename without extension. Backups of other DB files in the folder are not removed
+        :return: Number of files removed
+        """
+        re_backup = re.compile(re.escape(str_db_name) + r"_backup\((\d{8})\)(?:_([0-9a-f]+)\.)?")
+        re_snapshot = re.compile(re.escape(str_db_name) + r"_snapshot\(([0-9a-f]+)\)")
+        dict_day_files = dict()  # Day string -> list of (path, snapshot hash)
+        list_snapshots = []
+        with os.scandir(bak_folder) as it_entries:
+            for entry in it_entries:
+                re_match = re_backup.match(entry.name)
+                if re_match:
+                    dict_day_files.setdefault(re_match.group(1), []).append((entry.path, re_match.group(2)))
+                elif re_snapshot.match(entry.name):
+                    list_snapshots.append((entry.path, re_snapshot.match(entry.name).group(1)))
+
+        list_days = sorted(dict_day_files, reverse=True)
+        set_days_kept = set(list_days[:max(cv.config_backups_keep_daily, 1)])  # The backup just saved is always kept
+        set_weeks = set()
+        for str_day in list_days:
+            try:
+                week = datetime.strptime(str_day, "%Y%m%d").isocalendar()[:2]
+            except ValueError:  # Not a backup date
+                set_days_kept.add(str_day)
+                continue
+            if week not in set_weeks and len(set_weeks) < cv.config_backups_keep_weekly:
+                set_weeks.add(week)
+                set_days_kept.add(str_day)
+
+        list_remove = [path for str_day in list_days if str_day not in set_days_kept
+                       for path, str_hash in dict_day_files[str_day]]
+        set_hashes_kept = {str_hash for str_day in set_days_kept for path, str_hash in dict_day_files[str_day]}
+        list_remove += [path for path, str_hash in list_snapshots if str_hash not in set_hashes_kept]
+        n_removed = 0
+        for path in list_remove:
+            try:
+                os.remove(path)
+                n_removed += 1
+            except OSError:  # In use or removed by other user. Tried again next time
+                pass
+        return n_removed
 
     def check_db_integrity(self):
         """Returns true if it is safe to overwrite the database"""
@@ -105,10 +396,19 @@ class AcroDbHandler:
         # acronyms DB file is in a shared folder and conexion is lost)
         flag_is_correct = False
         try:
-            db_file_path = Path(cv.config_acro_db_path)
-            with open(db_file_path, 'r', encoding="UTF-8") as db_file:
-                aux_full_db = json.load(db_file)
-            if aux_full_db['Admin_data']['Date'] == self.str_prev_date:
+            db_file_path = Path(self.str_db_path)  # The DB file loaded. The configured one can change after the load
+            path_journal = get_journal_path(db_file_path)
+            # 1. Files not modified since the load. Only their size and modification time are read
+            if (get_file_fingerprint(db_file_path), get_file_fingerprint(path_journal)) == self.db_fingerprint:
+                return True
+            str_db_date = self.__read_db_date(db_file_path)
+            # 2. Saves appended to the journal change the date too
+            list_records = self.__read_journal(path_journal)
+            if list_records[:1] == [["Snapshot", str_db_date]]:
+                for record in list_records[1:]:
+                    if record[0] == "Admin_data":
+                        str_db_date = record[1]['Date']
+            if str_db_date == self.str_prev_date:
                 flag_is_correct = True
         except FileNotFoundError as e:
             userCmdHandler.print_db_except_file_not_found(e)
@@ -118,31 +418,197 @@ class AcroDbHandler:
             userCmdHandler.print_db_except_key_error(e)
         return flag_is_correct
 
-    def load_acros_db(self):
-        """Loads the acronyms database file"""
-        userCmdHandler.print_db_loading_info(cv.config_acro_db_path)
+    def merge_db_changes(self, fcn_resolve_conflict):
+        """Merges the changes of this session with the DB file saved by other user since it was loaded (Three-way
+        merge). The base is the data of the changed acronyms as loaded. The DB file is not written, it has to be saved
+        after
+
+        :param fcn_resolve_conflict: Function called for the acronyms changed differently by both users. Receives the
+        acronym and both acronym data (None if deleted) and returns the data to keep
+        :return: False if the DB file can not be read
+        """
+        self._include_last_use_changes()
+        obj_db_theirs = AcroDbHandler(flag_load=False)
+        obj_db_theirs.load_acros_db(self.str_db_path)
+        if obj_db_theirs.str_prev_date == "":  # Not found or not parseable. Errors are already printed
+            return False
+
+        acros_theirs = obj_db_theirs.acros_db
+        set_acros = self.set_changed | self.set_deleted
+        dict_base_records = {acro: copy.deepcopy(acros_theirs.get(acro)) for acro in set_acros}
+        for acro in sorted(set_acros):
+            acro_data = self._merge_acro(acro, acros_theirs.get(acro), fcn_resolve_conflict)
+            if acro_data is not None:
+                acros_theirs[acro] = acro_data
+            else:
+                acros_theirs.pop(acro, None)
+        for acro in self.set_blacklist_changed:  # Toggles never conflict, the status set by this session is kept
+            if obj_db_theirs.is_blacklisted(acro) != self._is_in_own_blacklist(acro):
+                obj_db_theirs.toggle_in_blacklist(acro)
+
+        # Continue from the DB file read. Its journal is continued when saving
+        self.full_db['Acronyms'] = self.acros_db = acros_theirs
+        self.full_db['Blacklist'] = obj_db_theirs.full_db['Blacklist']
+        self.set_changed = {acro for acro in set_acros if acro in acros_theirs}
+        self.set_deleted = set_acros - self.set_changed
+        self.dict_base_records = dict_base_records
+        self.str_prev_date = obj_db_theirs.str_prev_date
+        self.str_snapshot_date = obj_db_theirs.str_snapshot_date
+        self.db_fingerprint = obj_db_theirs.db_fingerprint
+        self.str_db_hash = obj_db_theirs.str_db_hash
+        self._build_acro_key_index(self.acros_db)
+        self.bytes_db_ori = obj_db_theirs.bytes_db_ori  # The backup is the DB overwritten by this save
+        self.bytes_journal_ori = obj_db_theirs.bytes_journal_ori
+        return True
+
+    def _merge_acro(self, acro, acro_data_theirs, fcn_resolve_conflict):
+        """Returns the merged data of an acronym changed in this session. Used by merge_db_changes
+
+        :param acro: Acronym
+        :param acro_data_theirs: Acronym data in the DB file saved by other user. None if not in the DB
+        :param fcn_resolve_conflict: Function called if the acronym was changed differently by both users
+        :return: Acronym data. None if deleted
+        """
+        acro_data_base = self.dict_base_records.get(acro)
+        acro_data_ours = self.acros_db.get(acro)
+        if acro_data_theirs == acro_data_base or acro_data_theirs == acro_data_ours:
+            return acro_data_ours
+        if acro_data_ours == acro_data_base:
+            return acro_data_theirs
+
+        # Both changed. Only new last uses are merged, the rest of the data must be changed by one of them
+        def get_content(acro_data):
+            if acro_data is None:
+                return None
+            return acro_data.defs, acro_data.creation, acro_data.last_edit
+        content_base, content_ours, content_theirs = map(get_content, (acro_data_base, acro_data_ours, acro_data_theirs))
+        if content_theirs == content_base or content_theirs == content_ours:
+            acro_data = copy.deepcopy(acro_data_ours)
+        elif content_ours == content_base:
+            acro_data = copy.deepcopy(acro_data_theirs)
+        else:
+            return fcn_resolve_conflict(acro, acro_data_ours, acro_data_theirs)
+        if None not in (acro_data, acro_data_base, acro_data_ours, acro_data_theirs):
+            acro_data.last_uses = (acro_data_theirs.last_uses + [
+                last_use for last_use in acro_data_ours.last_uses if last_use not in acro_data_base.last_uses])[-5:]
+        return acro_data
+
+    def __read_db_date(self, db_file_path):
+        """Returns the save date of the DB file. Only the file header is read if the DB was saved with the admin data
+        and its date first, otherwise the whole file is read
+
+        :param db_file_path: Path object to the DB file
+        :return: Date string
+        """
+        with open(db_file_path, 'rb') as db_file:
+            bytes_header = db_file.read(dv.define_db_header_size)
+            # The date is the first key of the admin data. Files written by older program versions have it after the
+            # changelog, which can be longer than the header: the whole file is read
+            re_date = re.match(rb'\{\n  "Admin_data": \{\n    "Date": ("[^"\n]*")', bytes_header)
+            if re_date is not None:
+                return json.loads(re_date.group(1))
+            bytes_db = bytes_header + db_file.read()
+        if hashlib.sha256(bytes_db).hexdigest() == self.str_db_hash:  # Same content, only its modification time changed
+            return self.str_snapshot_date
+        return json.loads(bytes_db.decode("UTF-8"))['Admin_data']['Date']
+
+    def load_acros_db(self, str_db_path=None):
+        """Loads the acronyms database file
+
+        :param str_db_path: Path string to the DB file. If None the configured one is used
+        """
+        if str_db_path is None:
+            str_db_path = cv.config_acro_db_path
+        self.str_db_path = str_db_path
+        userCmdHandler.print_db_loading_info(str_db_path)
+        db_file_path = Path(str_db_path)
+        # Taken before reading, a change made while reading is detected when saving
+        self.db_fingerprint = (get_file_fingerprint(db_file_path), get_file_fingerprint(get_journal_path(db_file_path)))
+        if cv.config_use_db_replica and self.__load_replica():
+            userCmdHandler.print_db_replica_loaded()
+            return
+
         try:
-            db_file_path = Path(cv.config_acro_db_path)
-            with open(db_file_path, 'r', encoding="UTF-8") as db_file:
-                self.full_db = json.load(db_file)
-                try:
-                    self.str_prev_date = self.full_db['Admin_data']['Date']
-                except KeyError:
-                    self.str_prev_date = "Not found"
-                if cv.config_save_backups: #Todo: Perform a deep copy instead of reading two times the file?
-                    with open(db_file_path, 'r', encoding="UTF-8") as db_file:
-                        self.full_db_ori = json.load(db_file)
+            # The file is read once. The backup uses the same bytes instead of a copy of the DB object
+            bytes_db = db_file_path.read_bytes()
+            self.str_db_hash = hashlib.sha256(bytes_db).hexdigest()
+            self.full_db = json.loads(bytes_db.decode("UTF-8"))
+            try:
+                self.str_prev_date = self.full_db['Admin_data']['Date']
+            except KeyError:
+                self.str_prev_date = "Not found"
+            self.str_snapshot_date = self.str_prev_date
+            if cv.config_save_backups and not self.flag_read_only:
+                self.bytes_db_ori = bytes_db
         except FileNotFoundError as e:
             userCmdHandler.print_db_except_file_not_found(e)
         except json.decoder.JSONDecodeError as e:
             userCmdHandler.print_db_except_decode_error(e)
 
         self.__check_acros_db()
+        self.__replay_journal(db_file_path)
         self.acros_db = self.full_db['Acronyms']
+        self._build_acro_key_index(self.acros_db)
 
         if cv.config_use_non_matching_acro_from_db:
             self.__find_non_regex_acronyms()
 
+        # Only DB files read correctly and with nothing fixed by the checks
+        if cv.config_use_db_replica and self.str_db_hash and not self.is_dirty():
+            self.__store_replica()
+
+    # Attributes set by load_acros_db, stored in the local replica
+    _list_replica_attributes = ['full_db', 'str_prev_date', 'str_snapshot_date', 'str_db_hash', 'bytes_db_ori',
+                                'bytes_journal_ori', 'list_no_regex', 'special_acro_matcher', 'dict_acro_keys']
+
+    def __get_replica_path(self):
+        """Returns the path of the local replica of the DB file. There is one for each DB file"""
+        str_db_path_hash = hashlib.sha256(str(Path(self.str_db_path).resolve()).encode("utf-8")).hexdigest()
+        return Path(cv.config_cache_folder) / ("db_replica_" + str_db_path_hash + dv.define_db_replica_ext)
+
+    def __get_replica_key(self):
+        """Returns the values that must not change to use the local replica: the DB file and the configuration used
+        to check it"""
+        return [dv.define_acronymate_version, dv.define_db_replica_format_version, self.db_fingerprint,
+                cv.config_regex_acro_find, cv.config_use_non_matching_acro_from_db,
+                cv.config_save_backups and not self.flag_read_only]
+
+    def __load_replica(self):
+        """Loads the DB from its local replica, if the DB file has not changed since the replica was stored. The DB
+        file is not read, and the replica is already checked
+
+        :return: True if loaded
+        """
+        gc.disable()  # Only new objects are created. The garbage collector passes would take more than the load itself
+        try:
+            with open(self.__get_replica_path(), 'rb') as replica_file:
+                dict_replica = pickle.load(replica_file)  # Only written by this program, in the local cache folder
+        except Exception:  # Not found, damaged or written by other program version
+            return False
+        finally:
+            gc.enable()
+        if dict_replica.get('Key') != self.__get_replica_key():
+            return False
+        for str_attribute in self._list_replica_attributes:
+            setattr(self, str_attribute, dict_replica[str_attribute])
+        self.acros_db = self.full_db['Acronyms']
+        return True
+
+    def __store_replica(self):
+        """Stores the loaded DB in its local replica"""
+        dict_replica = {str_attribute: getattr(self, str_attribute) for str_attribute in self._list_replica_attributes}
+        dict_replica['Key'] = self.__get_replica_key()
+        try:
+            path_replica = self.__get_replica_path()
+            pathHelpers.ensure_directory(path_replica.parent)
+            # Written with another name and then renamed, other processes never read a half written file
+            path_tmp = path_replica.parent / (path_replica.name + ".%d.tmp" % os.getpid())
+            with open(path_tmp, 'wb') as replica_file:
+                pickle.dump(dict_replica, replica_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path_tmp, path_replica)
+        except OSError:  # The replica is optional
+            pass
+
     def __check_acros_db(self):
         """Checks the loaded database filled. Fixes missing labels if it can"""
         userCmdHandler.print_db_checking()
@@ -152,30 +618,28 @@ class AcroDbHandler:
             self.full_db['Acronyms'] = dict()
             flag_status = False
         else:
-            for key in self.full_db['Acronyms']:
-                if 'Def' not in self.full_db['Acronyms'][key]:
-                    self.full_db['Acronyms'][key]['Def'] = [{'Main': ""}]
-                if self.full_db['Acronyms'][key]['Def'][0]['Main'] == "":
+            # Missing labels are filled when building the records
+            self.full_db['Acronyms'] = {key: AcroDbRecord.from_dict(acro_data)
+                                        for key, acro_data in self.full_db['Acronyms'].items()}
+            for key, acro_record in self.full_db['Acronyms'].items():
+                if acro_record.defs[0]['Main'] == "":
                     userCmdHandler.print_db_check_empty_acro(key)
                     flag_status = False
 
-                if 'Properties' not in self.full_db['Acronyms'][key]:
-                    self.full_db['Acronyms'][key]['Properties'] = {'Creation': "", 'Last_edit': "", 'Last_uses': []}
-                if self.full_db['Acronyms'][key]['Properties']['Creation'] == "":
-                    self.full_db['Acronyms'][key]['Properties']['Creation'] = self.str_curr_date
+                if acro_record.creation == "":
+                    acro_record.creation = sys.intern(self.str_curr_date)
                     self.add_db_last_use(key, "Undefined_file")
-                if self.full_db['Acronyms'][key]['Properties']['Last_edit'] == "":
-                    self.full_db['Acronyms'][key]['Properties']['Last_edit'] = \
-                        self.full_db['Acronyms'][key]['Properties']['Creation']
+                    self.set_changed.add(key)  # Fixed, it has to be saved
+                if acro_record.last_edit == "":
+                    acro_record.last_edit = acro_record.creation
 
-        if 'Blacklist' not in self.full_db:
-            self.full_db['Blacklist'] = []
-            #Todo: Sanitize: Remove blacklist duplicates
+        # Set, duplicates are removed
+        self.full_db['Blacklist'] = set(self.full_db.get('Blacklist', []))
 
         if 'Admin_data' not in self.full_db:
             userCmdHandler.print_db_check_admin_data_wrong()
             self.full_db['Admin_data'] = dict()
-            self.__set_admin_data_in_db()
+            self._set_admin_data_in_db()
             flag_status = False
         else:
             if 'Date' not in self.full_db['Admin_data']:
@@ -185,7 +649,7 @@ class AcroDbHandler:
         if flag_status:
             userCmdHandler.print_ok(_("Base de datos correcta"))
 
-    def __set_admin_data_in_db(self):
+    def _set_admin_data_in_db(self):
         """Sets values asociated to ['Admin_data'] in the DB dictionary"""
         # Add microseconds to allow the possibility of detecting two persons opening the file the same second
         self.full_db['Admin_data']['Date'] = datetime.now().strftime("%d/%m/%Y %H:%M:%S %f")
@@ -195,4 +659,69 @@ class AcroDbHandler:
 
     def __find_non_regex_acronyms(self):
         """Compiles list of acronyms that do not match the current regex"""
-        self.list_no_regex = [acro for acro in self.acros_db.keys() if not re.fullmatch(cv.config_regex_acro_find, acro)]
+        self.set_non_regex_acronyms(
+            [acro for acro in self.acros_db.keys() if not re.fullmatch(cv.config_regex_acro_find, acro)])
+
+    def set_non_regex_acronyms(self, list_no_regex):
+        """Sets the list of acronyms that do not match the current regex and builds their matcher"""
+        self.list_no_regex = list_no_regex
+        # The matcher is built once per load, instead of joining all of them into a regex for each document
+        self.special_acro_matcher = acroSpecialMatcher.AcroSpecialMatcher(self.list_no_regex)
+
+    def set_db_layers(self, list_db_layers):
+        """Sets the DBs under this one (Ej: the company DB under a project DB). The acronyms not found in this DB are
+        searched in them, in order, and their blacklists are added. They are not merged: each layer keeps its own
+        objects and replica, and changes are only written to this DB
+
+        :param list_db_layers: List of AcroDbHandler objects, loaded with flag_read_only
+        """
+        self.list_db_layers = list_db_layers
+        if cv.config_use_non_matching_acro_from_db and list_db_layers:
+            self.set_non_regex_acronyms(sorted(set(self.list_no_regex).union(
+                *(obj_db_layer.list_no_regex for obj_db_layer in list_db_layers))))
+
+
+def get_journal_path(path_db):
+    """Returns the path of the journal of a DB file, where the changes are appended between full saves"""
+    return Path(str(path_db) + dv.define_db_journal_ext)
+
+
+def get_file_fingerprint(path_file):
+    """Returns the size and modification time of a file, None if it does not exist. Used to detect changes"""
+    try:
+        file_stat = os.stat(path_file)
+        return file_stat.st_size, file_stat.st_mtime_ns
+    except OSError:
+        return None
+
+
+def write_backup(path_output, bytes_backup):
+    """Writes a backup file, compressed with the configured method
+
+    :param path_output: Backup file path, with the compression extension
+    :param bytes_backup: Bytes to save
+    """
+    if cv.config_backup_compression == dv.define_backup_compression_gzip:
+        bytes_backup = gzip.compress(bytes_backup)
+    elif cv.config_backup_compression == dv.define_backup_compression_lzma:
+        bytes_backup = lzma.compress(bytes_backup)
+    with open(path_output, 'wb') as bak_file:
+        bak_file.write(bytes_backup)
+
+
+def dumps_db(full_db):
+    """Returns the json string of a full DB object. Keys are sorted, but Admin_data goes first with its Date first: the
+    save date can be read from the file header without parsing the whole file, even with a long Changelog
+
+    :param full_db: Full DB object, with the Acronyms (AcroDbRecord objects), Blacklist and Admin_data keys
+    :return: Json string
+    """
+    dict_admin_data = json.loads(json.dumps(full_db['Admin_data'], sort_keys=True))  # Sorted, also the nested keys
+    if 'Date' in dict_admin_data:
+        dict_admin_data = {'Date': dict_admin_data.pop('Date'), **dict_admin_data}
+    str_admin_data = json.dumps({'Admin_data': dict_admin_data}, ensure_ascii=False, indent=2)
+    dict_rest = {key: value for key, value in full_db.items() if key not in ('Admin_data', 'Acronyms', 'Blacklist')}
+    dict_rest['Acronyms'] = {acro: acro_record.to_dict() for acro, acro_record in full_db['Acronyms'].items()}
+    dict_rest['Blacklist'] = sorted(full_db['Blacklist'])
+    str_rest = json.dumps(dict_rest, ensure_ascii=False, sort_keys=True, indent=2)
+    return str_admin_data[:-len("\n}")] + ",\n" + str_rest[len("{\n"):]
@@ -0,0 +1,279 @@
+import os
+import re
+import json
+import sqlite3
+from pathlib import Path
+from src.common import defines as dv
+from src.common import configVars as cv
+from src.acroHandlers import acroDbHandler
+from src.cmdInterface import userCmdHandler
+
+"""SQLite storage backend of the acronym database. Used when the DB file has one of the SQLite extensions"""
+
+# Lists and dicts are stored as json strings. The primary keys are the indexes used by all the searches
+_SQL_CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS Acronyms (Acronym TEXT PRIMARY KEY, Def TEXT NOT NULL, Creation TEXT NOT NULL,
+                                     Last_edit TEXT NOT NULL, Last_uses TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS Blacklist (Acronym TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS Admin_data (Key TEXT PRIMARY KEY, Value TEXT NOT NULL) WITHOUT ROWID;
+"""
+_SQL_UPSERT_ACRONYM = "INSERT OR REPLACE INTO Acronyms VALUES (?, ?, ?, ?, ?)"
+
+
+def is_sqlite_db(str_db_path):
+    """Returns True if the DB file uses the SQLite backend"""
+    return Path(str_db_path).suffix.lower() in dv.define_db_sqlite_ext_list
+
+
+def connect_db(str_db_path, flag_read_only=False):
+    """Opens a SQLite DB file, creating its tables if needed
+
+    :param str_db_path: Path string to the DB file
+    :param flag_read_only: If True the file is opened read-only, and must exist. Used for the shared DB layers, that
+    can be in folders without write permission
+    :return: sqlite3 Connection object
+    """
+    if flag_read_only:
+        return sqlite3.connect(Path(str_db_path).resolve().as_uri() + "?mode=ro", uri=True)
+    conn = sqlite3.connect(str_db_path)
+    # Rollback journal. The DB is usually in a shared folder used by several PCs, and WAL mode needs shared memory in
+    # one host: SQLite can not detect a network folder, so its users could miss each other writes or corrupt the DB.
+    # Also converts back the DB files set to WAL by older program versions
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.executescript(_SQL_CREATE_TABLES)
+    return conn
+
+
+def import_json_db(str_json_path, str_db_path):
+    """Copies a JSON DB into a SQLite DB. Acronyms already in the SQLite DB are replaced
+
+    :param str_json_path: Path string to the JSON DB file
+    :param str_db_path: Path string to the SQLite DB file. Created if it does not exist
+    """
+    obj_json_db = acroDbHandler.AcroDbHandler(flag_load=False)
+    obj_json_db.load_acros_db(str_json_path)  # Also fixes the missing labels
+    conn = connect_db(str_db_path)
+    with conn:
+        conn.executemany(_SQL_UPSERT_ACRONYM, [_get_acronym_row(acro, acro_data)
+                                               for acro, acro_data in obj_json_db.acros_db.items()])
+        conn.executemany("INSERT OR IGNORE INTO Blacklist VALUES (?)",
+                         [(acro,) for acro in obj_json_db.full_db['Blacklist']])
+        conn.executemany("INSERT OR REPLACE INTO Admin_data VALUES (?, ?)",
+                         [(key, json.dumps(value, ensure_ascii=False))
+                          for key, value in obj_json_db.full_db['Admin_data'].items()])
+    conn.close()
+
+
+def export_json_db(str_db_path, str_json_path):
+    """Writes a SQLite DB as a JSON DB, with the same format AcroDbHandler saves
+
+    :param str_db_path: Path string to the SQLite DB file
+    :param str_json_path: Path string to the JSON DB file
+    """
+    conn = connect_db(str_db_path)
+    full_db = {
+        'Acronyms': {row[0]: _get_acronym_data(row) for row in conn.execute("SELECT * FROM Acronyms")},
+        'Blacklist': {acro for (acro,) in conn.execute("SELECT Acronym FROM Blacklist")},
+        'Admin_data': {key: json.loads(value) for key, value in conn.execute("SELECT Key, Value FROM Admin_data")},
+    }
+    conn.close()
+    with open(str_json_path, 'w', encoding="utf-8") as db_file:
+        db_file.write(acroDbHandler.dumps_db(full_db))
+
+
+def convert_db(str_path_in, str_path_out):
+    """Converts a DB file between the JSON and SQLite formats. The direction is given by the file extensions"""
+    if is_sqlite_db(str_path_out):
+        import_json_db(str_path_in, str_path_out)
+    else:
+        export_json_db(str_path_in, str_path_out)
+
+
+def _get_acronym_row(acro, acro_record):
+    """Returns the Acronyms table row of an acronym"""
+    return (acro, json.dumps(acro_record.defs, ensure_ascii=False), acro_record.creation, acro_record.last_edit,
+            json.dumps(acro_record.last_uses, ensure_ascii=False))
+
+
+def _get_acronym_data(row):
+    """Returns the AcroDbRecord of an Acronyms table row"""
+    return acroDbHandler.AcroDbRecord(json.loads(row[1]), row[2], row[3], json.loads(row[4]))
+
+
+class AcroDbSqliteHandler(acroDbHandler.AcroDbHandler):
+    """Acronym data base stored in a SQLite file. Same interface as AcroDbHandler, but the acronyms are not loaded at
+    start: each one is read from the file the first time it is used. On save only the acronyms changed are written, all
+    of them in one transaction"""
+    def __init__(self, flag_load=True, flag_read_only=False):
+        """Class constructor
+
+        :param flag_load: If False the DB file is not opened
+        :param flag_read_only: If True the DB is only a layer of other DB and the file is opened read-only
+        """
+        self.conn = None
+        self.dict_blacklist = dict()  # Blacklist status of the acronyms checked
+        super().__init__(flag_load, flag_read_only)
+
+    def load_acros_db(self, str_db_path=None):
+        """Opens the acronyms database file. Only the administration data and the acronym names are read
+
+        :param str_db_path: Path string to the DB file. If None the configured one is used
+        """
+        if str_db_path is None:
+            str_db_path = cv.config_acro_db_path
+        self.str_db_path = str_db_path
+        userCmdHandler.print_db_loading_info(str_db_path)
+        if self.conn is not None:
+            self.conn.close()
+        self.acros_db = dict()  # Acronyms read. Helper cache
+        self.full_db = {'Acronyms': self.acros_db, 'Admin_data': dict()}
+        self.set_changed = set()
+        self.set_last_use_changed = set()
+        self.set_deleted = set()
+        self.dict_blacklist = dict()
+        self.set_blacklist_changed = set()
+
+        try:
+            self.conn = connect_db(str_db_path, self.flag_read_only)
+            self.full_db['Admin_data'] = self.__read_admin_data(self.conn)
+        except sqlite3.Error as e:  # Only read-only files, the rest are created if not found. Used as an empty DB
+            userCmdHandler.print_db_except_decode_error(e)
+            self.conn = connect_db(":memory:")
+        self.str_prev_date = self.full_db['Admin_data'].get('Date', "Not found")
+        if 'Date' not in self.full_db['Admin_data']:
+            userCmdHandler.print_db_check_admin_data_wrong()
+
+        # Only the primary key index is read
+        list_acros = [acro for (acro,) in self.conn.execute("SELECT Acronym FROM Acronyms")]
+        self._build_acro_key_index(list_acros)
+        if cv.config_use_non_matching_acro_from_db:
+            self.set_non_regex_acronyms([acro for acro in list_acros
+                                         if not re.fullmatch(cv.config_regex_acro_find, acro)])
+
+    @staticmethod
+    def __read_admin_data(conn):
+        """Returns the administration data stored in a DB connection"""
+        return {key: json.loads(value) for key, value in conn.execute("SELECT Key, Value FROM Admin_data")}
+
+    def __read_acro(self, acro_in):
+        """Reads an acronym from the DB file into acros_db, if it exists and was not read before"""
+        if acro_in not in self.acros_db and acro_in not in self.set_deleted:
+            row = self.conn.execute("SELECT * FROM Acronyms WHERE Acronym = ?", (acro_in,)).fetchone()
+            if row is not None:
+                self.acros_db[acro_in] = _get_acronym_data(row)
+
+    def add_db_last_use(self, acro_in, str_last_use_file):
+        self.__read_acro(acro_in)
+        super().add_db_last_use(acro_in, str_last_use_file)
+
+    def search_def_in_db(self, acro_in):
+        self.__read_acro(acro_in)
+        return super().search_def_in_db(acro_in)
+
+    def delete_acro_in_db(self, acro_in):
+        self.__read_acro(acro_in)
+        return super().delete_acro_in_db(acro_in)
+
+    def update_acro_in_db(self, acro_in, def_list_in):
+        self.__read_acro(acro_in)
+        super().update_acro_in_db(acro_in, def_list_in)
+
+    def _is_in_own_blacklist(self, acro_in):
+        if acro_in not in self.dict_blacklist:
+            self.dict_blacklist[acro_in] = self.conn.execute(
+                "SELECT 1 FROM Blacklist WHERE Acronym = ?", (acro_in,)).fetchone() is not None
+        return self.dict_blacklist[acro_in]
+
+    def _set_in_own_blacklist(self, acro_in, flag_blacklisted):
+        self.dict_blacklist[acro_in] = flag_blacklisted
+
+    def save_db(self, path_output):
+        """Writes the changes to the database file. If the output is not the DB file, it is saved as a copy of the DB
+        file with the changes
+
+        :param path_output: Desired file output path
+        """
+        self._include_last_use_changes()
+        conn_out = self.conn
+        if Path(path_output).resolve() != Path(self.str_db_path).resolve():
+            conn_out = connect_db(path_output)
+            self.conn.backup(conn_out)
+        self._set_admin_data_in_db()
+        try:
+            with conn_out:  # One transaction. Other users never see half of the changes
+                conn_out.executemany("DELETE FROM Acronyms WHERE Acronym = ?",
+                                     [(acro,) for acro in self.set_deleted])
+                conn_out.executemany(_SQL_UPSERT_ACRONYM,
+                                     [_get_acronym_row(acro, self.acros_db[acro]) for acro in self.set_changed])
+                conn_out.executemany("INSERT OR IGNORE INTO Blacklist VALUES (?)",
+                                     [(acro,) for acro in self.set_blacklist_changed if self.dict_blacklist[acro]])
+                conn_out.executemany("DELETE FROM Blacklist WHERE Acronym = ?",
+                                     [(acro,) for acro in self.set_blacklist_changed if not self.dict_blacklist[acro]])
+                conn_out.executemany("INSERT OR REPLACE INTO Admin_data VALUES (?, ?)",
+                                     [(key, json.dumps(value, ensure_ascii=False))
+                                      for key, value in self.full_db['Admin_data'].items()])
+        except sqlite3.Error as e:  # Handled by the save functions as any other file error
+            raise OSError(e)
+        finally:
+            if conn_out is not self.conn:
+                conn_out.close()
+
+    def save_db_backup(self, path_output):
+        """Saves a copy of the database file, compressed as configured
+
+        :param path_output: Desired file output path
+        """
+        path_tmp = str(path_output) + ".%d.tmp" % os.getpid()
+        conn_out = sqlite3.connect(path_tmp)
+        try:
+            self.conn.backup(conn_out)
+        except sqlite3.Error as e:
+            raise OSError(e)
+        finally:
+            conn_out.close()
+        bytes_backup = Path(path_tmp).read_bytes()
+        os.remove(path_tmp)
+        acroDbHandler.write_backup(path_output, bytes_backup)
+
+    def check_db_integrity(self):
+        """Returns true if it is safe to overwrite the database"""
+        # Only the date row is read, instead of the whole DB file
+        flag_is_correct = False
+        try:
+            row = self.conn.execute("SELECT Value FROM Admin_data WHERE Key = 'Date'").fetchone()
+            flag_is_correct = (json.loads(row[0]) if row is not None else "Not found") == self.str_prev_date
+        except sqlite3.Error as e:
+            userCmdHandler.print_db_except_decode_error(e)
+        return flag_is_correct
+
+    def merge_db_changes(self, fcn_resolve_conflict):
+        """Merges the changes of this session with the DB file saved by other user since it was loaded (Three-way
+        merge). Only the rows of the acronyms changed are read. The blacklist needs no merge, only the acronyms toggled
+        are written
+
+        :param fcn_resolve_conflict: Function called for the acronyms changed differently by both users. Receives the
+        acronym and both acronym data (None if deleted) and returns the data to keep
+        :return: False if the DB file can not be read
+        """
+        self._include_last_use_changes()
+        try:
+            for acro in sorted(self.set_changed | self.set_deleted):
+                row = self.conn.execute("SELECT * FROM Acronyms WHERE Acronym = ?", (acro,)).fetchone()
+                acro_data_theirs = _get_acronym_data(row) if row is not None else None
+                acro_data = self._merge_acro(acro, acro_data_theirs, fcn_resolve_conflict)
+                self.dict_base_records[acro] = acro_data_theirs
+                if acro_data is not None:
+                    self.acros_db[acro] = acro_data
+                    self._add_to_acro_key_index(acro)
+                    self.set_changed.add(acro)
+                    self.set_deleted.discard(acro)
+                else:
+                    self.acros_db.pop(acro, None)
+                    self._remove_from_acro_key_index(acro)
+                    self.set_deleted.add(acro)
+                    self.set_changed.discard(acro)
+            self.str_prev_date = self.__read_admin_data(self.conn).get('Date', "Not found")
+        except sqlite3.Error as e:
+            userCmdHandler.print_db_except_decode_error(e)
+            return False
+        return True
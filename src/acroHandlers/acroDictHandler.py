@@ -1,31 +1,172 @@
-from src.acroHandlers import acroDbHandler
+import random
+from concurrent.futures import ThreadPoolExecutor
+from src.common import configVars as cv
+from src.common import stringHelpers as strHlprs
+from src.acroHandlers import acroDbHandler, acroDbSqliteHandler, acroTextArena
+from src.cmdInterface import cmdDeferredOutput
 
 
 class AcroDictHandler:
     """Class to handle all acronym data dictionaries and pass around data between functions"""
-    def __init__(self):
+    def __init__(self, obj_db=None, flag_background_load=False):
+        """Class constructor
+
+        :param obj_db: AcroDbHandler object to use. If None the DB is loaded
+        :param flag_background_load: If True the DB is loaded by other thread, while the document is selected and read.
+        It is waited for the first time obj_db is used
+        """
         # Get datetime once to keep it constant
         self.str_file = "Undefined"       # Filename for logging purposes
         self.str_file_open = "Undefined"  # Filename of opened file. Can differ from previous if launched from Word macro
 
         self.acros_found = dict()              # Acronyms found in the document
+        self.doc_text_arena = acroTextArena.AcroTextArena()  # Text of the document blocks with acronyms found
+        self.__dict_sample_rng = dict()        # Random generators for the sampling of stored matches
+        self.dict_acro_files = dict()          # Files where each acronym was found. Only filled in batch mode
 
         self.acros_doc_table = dict()          # Acronyms from the document acronyms table
+        self.__dict_doc_table_keys = None      # Normalized key -> set of doc table acronyms. Built on first use
         self.flag_doc_table_processed = False  # True if the document acronyms table is found and processed
 
         self.acros_output = dict()             # Acronyms to be exported
 
-        self.obj_db = acroDbHandler.AcroDbHandler()  # Object to handle DB
+        self._obj_db = obj_db  # Object to handle DB
+        self.__future_db = None  # DB being loaded in the background
+        self.__deferred_output = None  # Output of the background load, shown when it is waited for
+        if obj_db is None:
+            # SQLite DB files are only opened, and their connection can not be used by other thread
+            if flag_background_load and not any(acroDbSqliteHandler.is_sqlite_db(str_db_path) for str_db_path
+                                                in [cv.config_acro_db_path] + cv.config_acro_db_layer_paths):
+                self.__deferred_output = cmdDeferredOutput.CmdDeferredOutput()
+                executor = ThreadPoolExecutor(max_workers=1)
+                self.__future_db = executor.submit(self.__load_db_with_layers)
+                executor.shutdown(wait=False)  # Its thread ends after the load
+            else:
+                self.load_db()
+
+    @property
+    def obj_db(self):
+        """DB handler object. If it is being loaded in the background, waits until it is ready"""
+        self.__wait_background_load()
+        return self._obj_db
+
+    def __wait_background_load(self):
+        """Waits for the background load of the DB, if there is one, and sets its DB handler"""
+        if self.__future_db is not None:
+            try:
+                self._obj_db = self.__future_db.result()
+            finally:
+                self.__future_db = None
+                self.__deferred_output.release()
+
+    def is_db_loaded(self):
+        """Returns True if the DB can be used without waiting for the background load"""
+        return self.__future_db is None or self.__future_db.done()
+
+    def load_db(self):
+        """Loads the configured DB file and its read-only layers. A background load still running (Ej: the DB path was
+        changed in the configuration menu) is finished first, so it never replaces the DB loaded here"""
+        self.__wait_background_load()
+        self._obj_db = self.__load_db_with_layers()
+
+    @staticmethod
+    def __load_db_with_layers():
+        """Returns the DB handler of the configured DB file, with the configured DB layers set"""
+        obj_db = AcroDictHandler.__load_db_file(cv.config_acro_db_path)
+        # Each layer is loaded on its own, with its own replica. Only the DB file is written
+        obj_db.set_db_layers([AcroDictHandler.__load_db_file(str_db_path, flag_read_only=True)
+                              for str_db_path in cv.config_acro_db_layer_paths])
+        return obj_db
+
+    @staticmethod
+    def __load_db_file(str_db_path, flag_read_only=False):
+        """Returns the DB handler of a DB file. The handler depends on the file format"""
+        if acroDbSqliteHandler.is_sqlite_db(str_db_path):
+            obj_db = acroDbSqliteHandler.AcroDbSqliteHandler(flag_load=False, flag_read_only=flag_read_only)
+        else:
+            obj_db = acroDbHandler.AcroDbHandler(flag_load=False, flag_read_only=flag_read_only)
+        obj_db.load_acros_db(str_db_path)
+        return obj_db
 
     ############# ACRONYM FOUND FUNCTIONS #############
-    def add_acronym_found(self, acro_in, str_context_in):
+    def add_acronym_found(self, acro_in, block_idx, idx_start, idx_end):
+        """Stores an acronym match. The match points to a text block stored in doc_text_arena"""
         # Create empty dict if acronym is first found
         if acro_in not in self.acros_found:
-            self.acros_found[acro_in] = {'Count': 0, 'Context': []}
+            self.acros_found[acro_in] = {'Count': 0, 'Matches': []}
 
-        # Store data of acronym in dict
+        # Store data of acronym in dict. The count is always exact, but the number of matches stored is limited
         self.acros_found[acro_in]['Count'] += 1
-        self.acros_found[acro_in]['Context'].append(str_context_in)
+        self.__store_match(acro_in, acroTextArena.AcroMatch(block_idx, idx_start, idx_end))
+
+    def __store_match(self, acro_in, acro_match):
+        """Stores an acronym match if there is room for it. Its count has to be already updated"""
+        list_matches = self.acros_found[acro_in]['Matches']
+        max_matches = cv.config_max_contexts_per_acro
+        if max_matches <= 0 or len(list_matches) < max_matches:
+            list_matches.append(acro_match)
+        else:
+            # The first half is kept and the rest is a reservoir sample of the remaining matches. The generator is
+            # seeded with the acronym so the selection is the same on every run
+            n_head = max_matches // 2
+            if acro_in not in self.__dict_sample_rng:
+                self.__dict_sample_rng[acro_in] = random.Random(acro_in)
+            idx_sample = self.__dict_sample_rng[acro_in].randrange(self.acros_found[acro_in]['Count'] - n_head)
+            if idx_sample < max_matches - n_head:
+                list_matches[n_head + idx_sample] = acro_match
+
+    def merge_acronyms_found(self, str_file, acros_found, doc_text_arena, acros_doc_table):
+        """Adds the results of the acronym search of other document. Used in batch mode
+
+        :param str_file: Filename of the document. Stored for the acronyms last uses
+        :param acros_found: Acronyms found dictionary of the document
+        :param doc_text_arena: AcroTextArena of the document. Its matches are updated to point to this handler arena
+        :param acros_doc_table: Acronyms from the document acronyms table
+        """
+        block_offset = self.doc_text_arena.extend(doc_text_arena)
+        for acro, acro_found in acros_found.items():
+            if acro not in self.acros_found:
+                self.acros_found[acro] = {'Count': 0, 'Matches': []}
+                self.dict_acro_files[acro] = []
+            self.dict_acro_files[acro].append(str_file)
+
+            for acro_match in acro_found['Matches']:
+                acro_match.block_idx += block_offset
+                self.acros_found[acro]['Count'] += 1
+                self.__store_match(acro, acro_match)
+            # Matches not stored by the document handler are only counted
+            self.acros_found[acro]['Count'] += acro_found['Count'] - len(acro_found['Matches'])
+
+        self.__dict_doc_table_keys = None
+        for acro, doc_table_entry in acros_doc_table.items():
+            if acro not in self.acros_doc_table:
+                self.acros_doc_table[acro] = {'Def': []}
+            for definition in doc_table_entry['Def']:
+                if definition not in self.acros_doc_table[acro]['Def']:
+                    self.acros_doc_table[acro]['Def'].append(definition)
+        if acros_doc_table:
+            self.flag_doc_table_processed = True
+
+    def get_acronym_matches(self, acro_in):
+        """Returns the stored acronym matches in document order"""
+        return sorted(self.acros_found[acro_in]['Matches'], key=lambda acro_match: (acro_match.block_idx,
+                                                                                  acro_match.start))
+
+    def get_acronym_contexts(self, acro_in):
+        """Returns the context strings of the stored acronym matches. They are rendered from the stored document text"""
+        return [self.doc_text_arena.get_context(acro_match) for acro_match in self.get_acronym_matches(acro_in)]
+
+    def get_acronym_stories(self, acro_in):
+        """Returns the document story of the stored acronym matches"""
+        return [self.doc_text_arena.get_story(acro_match) for acro_match in self.get_acronym_matches(acro_in)]
+
+    def get_acronym_omitted_count(self, acro_in):
+        """Returns the number of acronym matches whose context was not stored"""
+        return self.acros_found[acro_in]['Count'] - len(self.acros_found[acro_in]['Matches'])
+
+    def compact_doc_text_arena(self):
+        """Removes from the text arena the blocks not used by any stored match. Call it after the acronym search"""
+        self.doc_text_arena.compact([acro_found['Matches'] for acro_found in self.acros_found.values()])
 
     ############# ACRONYM DOC TABLE FUNCTIONS #############
     def search_def_in_doc_table(self, acro_in):
@@ -35,7 +176,24 @@ class AcroDictHandler:
             definition_list_out = self.acros_doc_table[acro_in]['Def']
         return definition_list_out
 
+    def search_similar_acros_in_doc_table(self, acro_in):
+        """Returns the document acronyms table acronyms written as acro_in except for accents, capitalization, points or
+        plural. The acronym itself is not included. The index is built on the first search, once the document is read
+
+        :param acro_in: Acronym
+        :return: Sorted list of acronyms
+        """
+        if self.__dict_doc_table_keys is None:
+            self.__dict_doc_table_keys = dict()
+            for acro in self.acros_doc_table:
+                self.__dict_doc_table_keys.setdefault(strHlprs.get_acro_key(acro), set()).add(acro)
+        str_key = strHlprs.get_acro_key(acro_in)
+        if str_key == "":
+            return []
+        return sorted(self.__dict_doc_table_keys.get(str_key, set()) - {acro_in})
+
     def add_acronym_doc_table(self, acro_in, str_main, str_trans):
+        self.__dict_doc_table_keys = None
         # Create dict entry
         if acro_in not in self.acros_doc_table:
             # Some tables have duplicated lines for multiple definitions
@@ -63,4 +221,5 @@ class AcroDictHandler:
     def mark_acro_output_as_used(self):
         """Stores in a list what acronyms were used. Call this function before exporting"""
         for acro in self.acros_output:
-            self.obj_db.add_db_last_use(acro, self.str_file)
\ No newline at end of file
+            for str_file in self.dict_acro_files.get(acro, [self.str_file]):
+                self.obj_db.add_db_last_use(acro, str_file)
\ No newline at end of file
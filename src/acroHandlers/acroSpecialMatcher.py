@@ -0,0 +1,70 @@
+import re
+
+
+class AcroSpecialMatcher:
+    """Multi-pattern matcher for the special acronyms, those that do not match the main regex (Ej: ExCOMMS, Ver.).
+    Replaces a regex with all of them joined by '|', which gets slower to compile and to match with each acronym added.
+
+    The acronyms are stored in a trie. A match must start at a word boundary, as the '\\b' of the old regex, so the trie
+    is only walked from the boundaries whose character starts any acronym. These are found with a small regex. The
+    search time does not depend on the number of acronyms stored"""
+    _END = ""  # Trie key marking the end of an acronym. Never used by a character
+
+    def __init__(self, acro_list=()):
+        """Class constructor
+
+        :param acro_list: Iterable with the acronyms to search
+        """
+        self._trie = dict()
+        self._n_acros = 0
+        self._regex_start = None  # Compiled when needed, after all acronyms are added
+        for acro in acro_list:
+            self.add(acro)
+
+    def __len__(self):
+        return self._n_acros
+
+    def add(self, acro_in):
+        """Adds an acronym to the matcher"""
+        if acro_in != "":
+            node = self._trie
+            for char in acro_in:
+                node = node.setdefault(char, dict())
+            if self._END not in node:
+                node[self._END] = True
+                self._n_acros += 1
+                self._regex_start = None
+
+    def find_all(self, str_in):
+        """Returns the longest acronym found at each valid start position of a string. An acronym is valid if it starts
+        at a word boundary and is not followed by a word character, as r'\\b(...)(?![\\wÁÉÍÓÚ])' does
+
+        :param str_in: Input text string
+        :return: Dictionary start index -> end index
+        """
+        dict_matches = dict()
+        if self._n_acros > 0:
+            if self._regex_start is None:
+                str_first_chars = ''.join(re.escape(char) for char in self._trie if char != self._END)
+                self._regex_start = re.compile(r'\b(?=[' + str_first_chars + r'])')
+
+            len_str = len(str_in)
+            for re_start in self._regex_start.finditer(str_in):
+                idx_start = re_start.start()
+                idx_end = -1
+                node = self._trie
+                idx = idx_start
+                # Walk the trie while the text matches. Keep the longest acronym with a valid ending
+                while idx < len_str and str_in[idx] in node:
+                    node = node[str_in[idx]]
+                    idx += 1
+                    if self._END in node and (idx == len_str or not is_word_char(str_in[idx])):
+                        idx_end = idx
+                if idx_end != -1:
+                    dict_matches[idx_start] = idx_end
+        return dict_matches
+
+
+def is_word_char(char):
+    """Returns True if the character is matched by the regex '\\w'"""
+    return char.isalnum() or char == "_"
@@ -0,0 +1,109 @@
+from src.cmdInterface import ansiColorHelper
+
+
+class AcroMatch:
+    """Compact record of one acronym match. Points into a text block stored in the AcroTextArena"""
+    __slots__ = ('block_idx', 'start', 'end')
+
+    def __init__(self, block_idx, start, end):
+        self.block_idx = block_idx  # Index of the text block in the arena
+        self.start = start          # Start of the acronym in the block text
+        self.end = end              # End of the acronym in the block text
+
+
+class AcroTextArena:
+    """Stores the text of the document blocks where acronyms were found. Matches only keep offsets to this text and
+    their context strings are rendered when needed, instead of building one highlighted string per match"""
+    context_width = 200  # Characters shown around an acronym
+
+    def __init__(self):
+        self.stories = []  # Story names. Blocks reference them by index
+        self.block_texts = []
+        self.block_story_ids = []
+
+    def add_block(self, str_story, str_text):
+        """Adds a text block and returns its index
+
+        :param str_story: Document story the text belongs to
+        :param str_text: Block text, as used to find the acronyms
+        :return: Block index
+        """
+        if str_story not in self.stories:
+            self.stories.append(str_story)
+        self.block_texts.append(str_text)
+        self.block_story_ids.append(self.stories.index(str_story))
+        return len(self.block_texts) - 1
+
+    def extend(self, other_arena):
+        """Appends the blocks of another arena. The block indexes of its matches have to be shifted by the returned offset
+
+        :param other_arena: AcroTextArena object
+        :return: Index of the first appended block
+        """
+        block_offset = len(self.block_texts)
+        list_story_ids = []
+        for str_story in other_arena.stories:
+            if str_story not in self.stories:
+                self.stories.append(str_story)
+            list_story_ids.append(self.stories.index(str_story))
+        self.block_texts += other_arena.block_texts
+        self.block_story_ids += [list_story_ids[story_id] for story_id in other_arena.block_story_ids]
+        return block_offset
+
+    def compact(self, match_lists):
+        """Removes the blocks not referenced by any match and updates the match block indexes
+
+        :param match_lists: Iterable with lists of all the AcroMatch objects pointing to this arena
+        """
+        match_lists = list(match_lists)
+        set_used_blocks = {acro_match.block_idx for list_matches in match_lists for acro_match in list_matches}
+        if len(set_used_blocks) < len(self.block_texts):
+            dict_new_idx = dict()
+            block_texts = []
+            block_story_ids = []
+            for block_idx in sorted(set_used_blocks):  # Sorted to keep the document order
+                dict_new_idx[block_idx] = len(block_texts)
+                block_texts.append(self.block_texts[block_idx])
+                block_story_ids.append(self.block_story_ids[block_idx])
+            self.block_texts = block_texts
+            self.block_story_ids = block_story_ids
+
+            for list_matches in match_lists:
+                for acro_match in list_matches:
+                    acro_match.block_idx = dict_new_idx[acro_match.block_idx]
+
+    def get_story(self, acro_match):
+        """Returns the story where the match was found"""
+        return self.stories[self.block_story_ids[acro_match.block_idx]]
+
+    def get_acronym(self, acro_match):
+        """Returns the matched acronym string"""
+        return self.block_texts[acro_match.block_idx][acro_match.start:acro_match.end]
+
+    def get_context(self, acro_match):
+        """Returns the match context for user analysis (Only part of the block) with the acronym remarked using ANSI
+        Color Codes
+
+        :param acro_match: AcroMatch object
+        :return: Context string
+        """
+        str_in = self.block_texts[acro_match.block_idx]
+        # Ensure the context width is achieved
+        prev_context = self.context_width / 2
+        next_context = self.context_width / 2
+        # Check if there are unused characters at front/back after adding/subtracting the context. If so, add
+        # them to the opposite side.
+        char_diff_ini = acro_match.start - self.context_width / 2
+        if char_diff_ini < 0:
+            next_context -= char_diff_ini  # Addition, double negative
+        char_diff_end = len(str_in) - (acro_match.start + self.context_width / 2)
+        if char_diff_end < 0:
+            prev_context -= char_diff_end  # Addition, double negative
+
+        context_substr_ini = int(max(acro_match.start - prev_context, 0))
+        context_substr_end = int(min(acro_match.start + next_context, len(str_in)))
+
+        return ansiColorHelper.highlight_substr(
+            str_in[context_substr_ini:context_substr_end],
+            (acro_match.start - context_substr_ini, acro_match.end - context_substr_ini),
+            ansiColorHelper.AnsiColorCode.CYAN)
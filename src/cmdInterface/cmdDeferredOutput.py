@@ -0,0 +1,37 @@
+import sys
+import threading
+
+
+class CmdDeferredOutput:
+    """Replaces the console output while background threads run. The output of the thread that installed it is written
+    as usual, the output of the rest of threads is kept and written when it is released. This way the prints of a
+    background task do not mix with progress bars and user prompts"""
+    def __init__(self):
+        self.stream = sys.stdout
+        self.thread_ident = threading.get_ident()
+        self.list_deferred = []
+        self.lock = threading.Lock()
+        sys.stdout = self
+
+    def write(self, str_in):
+        if threading.get_ident() == self.thread_ident:
+            return self.stream.write(str_in)
+        with self.lock:
+            self.list_deferred.append(str_in)
+        return len(str_in)
+
+    def flush(self):
+        if threading.get_ident() == self.thread_ident:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)  # Encoding, isatty, ...
+
+    def release(self):
+        """Restores the console output and writes the output kept. Called once the background threads are done"""
+        if sys.stdout is self:
+            sys.stdout = self.stream
+        with self.lock:
+            self.stream.write(''.join(self.list_deferred))
+            self.list_deferred = []
+        self.stream.flush()
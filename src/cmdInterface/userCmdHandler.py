@@ -86,7 +86,7 @@ def config_menu(acro_dict_handler):
 
         configHandler.apply_config()
         if flag_db_path_updated:
-            acro_dict_handler.obj_db.load_acros_db()
+            acro_dict_handler.load_db()
     else:
         load_config_data()
 
@@ -117,13 +117,14 @@ def config_db_path():
             input_path = Path(input(_("Introduce ruta: ")).strip())
             if input_path.exists():
                 if input_path.is_file():
-                    if input_path.suffix != ".json":
-                        print_error(_("ERROR - El fichero debe acabar en '.json'"))
+                    if input_path.suffix.lower() not in [".json"] + dv.define_db_sqlite_ext_list:
+                        print_error(_("ERROR - El fichero debe acabar en '.json' o '.sqlite'"))
                     else:
                         new_path = input_path
                         flag_finish = True
                 else:
-                    list_files = [x.name for x in input_path.glob("*.json") if x.is_file()]
+                    list_files = [x.name for x in input_path.iterdir() if x.is_file() and
+                                  x.suffix.lower() in [".json"] + dv.define_db_sqlite_ext_list]
                     new_path = input_path / list_files[get_user_option_from_list(list_files)]
                     flag_finish = True
             else:
@@ -258,8 +259,12 @@ def process_acro_found_one_by_one(acro_dict_handler, flag_auto_command):
         # Print acronym matches
         print(ach.color_str(_("Coincidencias:"),
                             ach.AnsiColorCode.BOLD), acro_dict_handler.acros_found[acro_list[acro_idx]]['Count'])
-        for context in acro_dict_handler.acros_found[acro_list[acro_idx]]['Context']:
+        for context in acro_dict_handler.get_acronym_contexts(acro_list[acro_idx]):
             print("     ", context)
+        n_omitted = acro_dict_handler.get_acronym_omitted_count(acro_list[acro_idx])
+        if n_omitted > 0:
+            print("     ", ach.color_str(_("... y %d coincidencias más sin contexto guardado") % n_omitted,
+                                         ach.AnsiColorCode.GRAY))
 
         # Print found definitions
         print(str_half_header)
@@ -268,6 +273,13 @@ def process_acro_found_one_by_one(acro_dict_handler, flag_auto_command):
         print(aux_acro_obj.get_str_pretty_definition_list(aux_acro_obj.def_list_doc_table))
         print(_("      Base de datos: "), end="")
         print(aux_acro_obj.get_str_pretty_definition_list(aux_acro_obj.def_list_db))
+        for acro_similar, def_list_similar in aux_acro_obj.dict_similar_defs.items():
+            print(_("   Acrónimo similar: "), end="")
+            print(acro_similar, aux_acro_obj.get_str_pretty_definition_list(def_list_similar))
+        if aux_acro_obj.has_only_similar_defs():  # Never used without asking, the auto mode does not use them
+            acro_similar = next(iter(aux_acro_obj.dict_similar_defs))
+            if get_user_confirmation(_("¿Usar las definiciones de %s?") % acro_similar):
+                aux_acro_obj.use_similar_defs(acro_similar)
         if aux_acro_obj.defs_discrepancy():
             print_warn(_("Discrepancia detectada entre base de datos y tabla del documento"))
 
@@ -369,7 +381,8 @@ def process_acro_command_select(aux_acro_obj):
 
 def process_acro_command_blacklist(aux_acro_obj):
     flag_finish = False
-    aux_acro_obj.toggle_blacklisted_status()
+    if not aux_acro_obj.toggle_blacklisted_status():
+        print_warn(_("El acrónimo está en la lista negra de una base de datos de solo lectura"))
     return flag_finish
 
 
@@ -436,9 +449,10 @@ def handle_db_save(acro_dict_handler):
     :param acro_dict_handler: Acronym dictionary object
     """
     # Only save for manual/semi modes. In export/auto modes there are no valid changes and it would generate too many backups
-    if acro_dict_handler.obj_db.needs_save:
+    # Runs without changes are not saved either
+    if acro_dict_handler.obj_db.needs_save and acro_dict_handler.obj_db.is_dirty():
         print(_("Guardando\nResumen de cambios en la base de datos:"), acro_dict_handler.obj_db.log_db_changes)
-        path_output = Path(cv.config_acro_db_path)
+        path_output = Path(acro_dict_handler.obj_db.str_db_path)  # The file checked and merged is the one loaded
         folder_output = path_output.parent
         db_filename = path_output.name
 
@@ -447,29 +461,67 @@ def handle_db_save(acro_dict_handler):
         if folder_output.exists():
             if path_output.exists():  # Skip checks if db file does't exist yet
                 if not acro_dict_handler.obj_db.check_db_integrity():  # Check if file was updated by another user before saving
-                    print_warn(_("ATENCIÓN - Es posible que otro usuario haya modificado el archivo de base de datos. Se recomienda guardar con otro nombre y revisar los cambios manualmente."))
-                    if get_user_confirmation(_("¿Guardar con otro nombre?")):
-                        db_filename_list = db_filename.split('.')
-                        db_filename = db_filename_list[0]+"_unverfied."+db_filename_list[1]
-                        flag_overwrite = False
+                    # The changes of the other user are merged. If the file can not be read, it is left to the user
+                    if acro_dict_handler.obj_db.merge_db_changes(resolve_db_merge_conflict):
+                        print_ok(_("Se han combinado los cambios de otro usuario en la base de datos"))
+                    else:
+                        print_warn(_("ATENCIÓN - Es posible que otro usuario haya modificado el archivo de base de datos. Se recomienda guardar con otro nombre y revisar los cambios manualmente."))
+                        if get_user_confirmation(_("¿Guardar con otro nombre?")):
+                            db_filename_list = db_filename.split('.')
+                            db_filename = db_filename_list[0]+"_unverfied."+db_filename_list[1]
+                            flag_overwrite = False
         else:
             print_error(_("La ruta %s no es accesible") % folder_output)
             folder_output = get_existing_folder_from_user()
         save_file(folder_output, db_filename, flag_overwrite, acro_dict_handler.obj_db.save_db)
 
-        # Same simplified logic for the backup file. Backups are not overwriten, less checks needed
-        if cv.config_save_backups:  # todo, delete older files?
-            flag_overwrite = False
-            bak_folder_output = Path(cv.config_acro_db_path).parent / cv.config_acro_db_bkp_rel_folder
-            aux_filename_list = Path(cv.config_acro_db_path).name.split('.')
-            bak_db_filename = aux_filename_list[0] + "_backup(" + datetime.now().strftime("%Y%m%d") + ")." + aux_filename_list[1]
+        # Same simplified logic for the backup file. One backup per day, overwritten by the next saves of the day
+        if cv.config_save_backups:
+            flag_overwrite = True
+            obj_db = acro_dict_handler.obj_db
+            bak_folder_output = Path(obj_db.str_db_path).parent / cv.config_acro_db_bkp_rel_folder
+            aux_filename_list = Path(obj_db.str_db_path).name.split('.')
+            bak_db_filename = aux_filename_list[0] + "_backup(" + datetime.now().strftime("%Y%m%d") + ")"
+            str_db_ext = "." + aux_filename_list[1]
+            str_compression_ext = dv.define_backup_compression_ext_dict[cv.config_backup_compression]
 
             pathHelpers.ensure_directory(bak_folder_output)
             if not bak_folder_output.exists():
                 print_error(_("La ruta %s no es accesible") % bak_folder_output)
                 bak_folder_output = get_existing_folder_from_user()
 
-            save_file(bak_folder_output, bak_db_filename, flag_overwrite, acro_dict_handler.obj_db.save_db_backup)
+            if cv.config_delta_backups and obj_db.str_db_hash:  # Only JSON DB files, they have a journal
+                # The DB file is only saved when it changes. Daily backups are its journal, named after it
+                str_snapshot_hash = obj_db.str_db_hash[:16]
+                snapshot_filename = aux_filename_list[0] + "_snapshot(" + str_snapshot_hash + ")" + str_db_ext
+                if not (Path(bak_folder_output) / (snapshot_filename + str_compression_ext)).exists():
+                    save_file(bak_folder_output, snapshot_filename + str_compression_ext, flag_overwrite,
+                              obj_db.save_db_backup_snapshot)
+                delta_filename = bak_db_filename + "_" + str_snapshot_hash + str_db_ext + dv.define_db_journal_ext
+                save_file(bak_folder_output, delta_filename + str_compression_ext, flag_overwrite,
+                          obj_db.save_db_backup_delta)
+            else:
+                save_file(bak_folder_output, bak_db_filename + str_db_ext + str_compression_ext, flag_overwrite,
+                          obj_db.save_db_backup)
+            obj_db.prune_backups(bak_folder_output, aux_filename_list[0])
+
+
+def resolve_db_merge_conflict(acro, acro_data_ours, acro_data_theirs):
+    """Asks the user which version to keep of an acronym changed by two users at the same time
+
+    :param acro: Acronym
+    :param acro_data_ours: Acronym data of this session. None if deleted
+    :param acro_data_theirs: Acronym data saved by the other user. None if deleted
+    :return: Acronym data to keep
+    """
+    print_warn(_("Conflicto: el acrónimo %s ha sido modificado también por otro usuario") % acro)
+    print(_("      Tu versión: "), end="")
+    print(acroAuxObj.AcroAuxObj.get_str_pretty_definition_list(acro_data_ours.defs if acro_data_ours else []))
+    print(_("Versión guardada: "), end="")
+    print(acroAuxObj.AcroAuxObj.get_str_pretty_definition_list(acro_data_theirs.defs if acro_data_theirs else []))
+    if get_user_confirmation(_("¿Mantener tu versión?")):
+        return acro_data_ours
+    return acro_data_theirs
 
 
 def save_file(folder, filename, overwrite, save_fcn, *args):
@@ -660,6 +712,9 @@ and managed"""
 def print_acronym_search_start():
     print(_("Extrayendo acrónimos del documento"))
 
+def print_acronym_search_cache_hit():
+    print(_("El documento no ha cambiado, se usan los resultados guardados en la caché"))
+
 def print_acronym_search_second_pass():
     print(_("Repasando la búsqueda con acrónimos especiales"))
 
@@ -672,6 +727,28 @@ def get_translated_str_paragraphs():
 def get_translated_str_sections():
     return _("Secciones")
 
+def get_translated_str_document():
+    return _("Documento")
+
+def get_translated_str_story_parts():
+    return _("Partes")
+
+#### DocxBatchReader ####
+def print_batch_search_start(n_files, n_jobs):
+    print(_("Extrayendo acrónimos de %d documentos (%d procesos)") % (n_files, n_jobs))
+
+def print_batch_file_error(filepath, e):
+    print_error(_("No se ha podido procesar el archivo %s: %s") % (filepath, str(e)))
+
+def print_batch_no_files_error(str_batch_path):
+    print_error(_("ERROR - No se encuentran archivos '.docx' en %s") % str_batch_path)
+
+def print_batch_all_files_failed_error(str_batch_path):
+    print_error(_("ERROR - No se ha podido procesar ningún archivo '.docx' de %s") % str_batch_path)
+
+def get_translated_str_files():
+    return _("Archivos")
+
 #### acroDbHandler ####
 def print_db_except_file_not_found(e):
     print_error(_("No se encuentra el archivo DB: %s") % str(e))
@@ -688,6 +765,9 @@ def print_db_loading_info(db_file_name):
 def print_db_checking():
     print(_("Comprobando estado de la base de datos ..."))
 
+def print_db_replica_loaded():
+    print_ok(_("Base de datos sin cambios, cargada desde la copia local"))
+
 def print_db_check_no_acros():
     print_warn(_("No se encuentran acrónimos, creando diccionario vacío"))
 
@@ -696,3 +776,6 @@ def print_db_check_empty_acro(key):
 
 def print_db_check_admin_data_wrong():
     print_warn(_("La sección Admin_data no es correcta, no se podrá verificar el guardado seguro"))
+
+def print_db_converted(str_path):
+    print_ok(_("Se ha guardado el fichero: %s") % str_path)
@@ -15,11 +15,16 @@ def save_config_file():
         "Acronym Search": {
             "Min acronym length": cv.config_min_acro_len,
             "Acronym table headers": cv.config_acronym_table_headers,
+            "Reader engine": cv.config_reader_engine,
+            "Max contexts per acronym": cv.config_max_contexts_per_acro,
         },
         "Paths": {
             "Export folder": cv.config_docx_export_folder,
             "DB path": cv.config_acro_db_path,
-            "DB backup relative folder": cv.config_acro_db_bkp_rel_folder
+            "DB layer paths": cv.config_acro_db_layer_paths,
+            "DB backup relative folder": cv.config_acro_db_bkp_rel_folder,
+            "Cache folder": cv.config_cache_folder,
+            "Shared cache relative folder": cv.config_cache_shared_rel_folder,
         },
         "Localization": {
             "Language": cv.config_locale
@@ -33,8 +38,23 @@ def save_config_file():
             "Use acronym document table": cv.config_use_acro_from_doc_table,
             "Use non matching acronyms from DB": cv.config_use_non_matching_acro_from_db,
             "Save backups": cv.config_save_backups,
+            "Delta backups": cv.config_delta_backups,
+            "Use DB journal": cv.config_use_db_journal,
+            "Use DB replica": cv.config_use_db_replica,
+            "Load DB in background": cv.config_load_db_in_background,
             "Allow overwriting exported files": cv.config_allow_overwriting_exported,
             "Open docx after export": cv.config_open_docx_after_export,
+            "Use extraction cache": cv.config_use_extraction_cache,
+            "Use shared cache": cv.config_use_shared_cache,
+        },
+        "Cache": {
+            "Max size (MB)": cv.config_cache_max_size_mb,
+        },
+        "Database": {
+            "Journal max size (KB)": cv.config_db_journal_max_size_kb,
+            "Backup compression": cv.config_backup_compression,
+            "Backups kept daily": cv.config_backups_keep_daily,
+            "Backups kept weekly": cv.config_backups_keep_weekly,
         },
     }
 
@@ -57,10 +77,15 @@ def read_config_file():
         try:
             cv.config_min_acro_len = dict_config["Acronym Search"]["Min acronym length"]
             cv.config_acronym_table_headers = dict_config["Acronym Search"]["Acronym table headers"]
+            cv.config_reader_engine = dict_config["Acronym Search"]["Reader engine"]
+            cv.config_max_contexts_per_acro = dict_config["Acronym Search"]["Max contexts per acronym"]
 
             cv.config_docx_export_folder = dict_config["Paths"]["Export folder"]
             cv.config_acro_db_path = dict_config["Paths"]["DB path"]
+            cv.config_acro_db_layer_paths = dict_config["Paths"]["DB layer paths"]
             cv.config_acro_db_bkp_rel_folder = dict_config["Paths"]["DB backup relative folder"]
+            cv.config_cache_folder = dict_config["Paths"]["Cache folder"]
+            cv.config_cache_shared_rel_folder = dict_config["Paths"]["Shared cache relative folder"]
 
             cv.config_locale = dict_config["Localization"]["Language"]
 
@@ -71,8 +96,21 @@ def read_config_file():
             cv.config_use_acro_from_doc_table = dict_config["Flags"]["Use acronym document table"]
             cv.config_use_non_matching_acro_from_db = dict_config["Flags"]["Use non matching acronyms from DB"]
             cv.config_save_backups = dict_config["Flags"]["Save backups"]
+            cv.config_delta_backups = dict_config["Flags"]["Delta backups"]
+            cv.config_use_db_journal = dict_config["Flags"]["Use DB journal"]
+            cv.config_use_db_replica = dict_config["Flags"]["Use DB replica"]
+            cv.config_load_db_in_background = dict_config["Flags"]["Load DB in background"]
             cv.config_allow_overwriting_exported = dict_config["Flags"]["Allow overwriting exported files"]
             cv.config_open_docx_after_export = dict_config["Flags"]["Open docx after export"]
+            cv.config_use_extraction_cache = dict_config["Flags"]["Use extraction cache"]
+            cv.config_use_shared_cache = dict_config["Flags"]["Use shared cache"]
+
+            cv.config_cache_max_size_mb = dict_config["Cache"]["Max size (MB)"]
+
+            cv.config_db_journal_max_size_kb = dict_config["Database"]["Journal max size (KB)"]
+            cv.config_backup_compression = dict_config["Database"]["Backup compression"]
+            cv.config_backups_keep_daily = dict_config["Database"]["Backups kept daily"]
+            cv.config_backups_keep_weekly = dict_config["Database"]["Backups kept weekly"]
 
             # UPDATE DEFINES
             cv.config_regex_acro_find = dv.define_regex_acro_find_raw.replace(
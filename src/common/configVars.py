@@ -6,6 +6,12 @@ from src.common import defines as dv
 # Minimum acronym length (Defined as number of capital letters together)
 config_min_acro_len = 2
 
+# Engine used to read the docx document. See defines for the available options
+config_reader_engine = dv.define_reader_engine_python_docx
+
+# Maximum number of matches whose context is stored for each acronym. The match count is always exact. 0 stores all
+config_max_contexts_per_acro = 50
+
 # Expected/possible document acronym table headers
 config_acronym_table_headers = [
     ["Acrónimo", "Definición"], ["Acrónimo", "Significado"], ["Acronym", "Definition"], ["Acronym", "Meaning"]]
@@ -13,7 +19,10 @@ config_acronym_table_headers = [
 # --------- FILE PATHS -------------
 config_acro_db_path = "data/acronymate_DB.json"  # Path to database file is stored (You can keep multiple DB files for different projects)
 config_docx_export_folder = "output"  # Folder where output acronym docx will be saved
+config_acro_db_layer_paths = []  # Read-only DB files under the DB, in priority order (Ej: the company DB). Acronyms not in the DB are searched in them
 config_acro_db_bkp_rel_folder = "backup/"  # Folder where databases backups will be saved. Relative to db_path
+config_cache_folder = "cache"  # Folder where the extraction results are cached
+config_cache_shared_rel_folder = "cache/"  # Folder of the shared extraction cache. Relative to db_path
 
 # --------- LOCALIZATION -------------
 config_locale = "es"
@@ -30,10 +39,27 @@ config_use_acro_from_doc_table = True  # Searches non regex matching acronyms fr
 config_use_non_matching_acro_from_db = True  # Adds to the search non regex matching acronyms added to the database
 # Storage flags
 config_save_backups = True  # Set to True to enable the creation of backups after each run
+config_delta_backups = False  # Daily backups only store the DB journal. The DB file is stored once for each version
+config_use_db_journal = False  # DB changes are appended to a journal file instead of writing the whole DB on every save
+# Note: Older program versions do not read the journal and would drop its changes. Only enable it if all users updated
+config_use_db_replica = True  # A checked copy of the DB is kept in the cache folder. Used while the DB file is unchanged
+config_load_db_in_background = True  # The DB is loaded while the document is selected and read
 config_allow_overwriting_exported = True  # Overwriting output files reduce the growth rate of the output folder
 # Note: Overwriting might not be possible if the file is in use. In that case the flag is ignored
 # Usability flags
 config_open_docx_after_export = True  # Opens the generated acronym .docx using the default program (Only for Windows)
+# Cache flags
+config_use_extraction_cache = True  # Unchanged documents are not read again, their previous results are used
+config_use_shared_cache = False  # Also uses the cache folder next to the DB, shared with other users
+
+# --------- CACHE -------------
+config_cache_max_size_mb = 200  # Maximum size of each cache folder. Least recently used results are removed first
+
+# --------- DATABASE -------------
+config_db_journal_max_size_kb = 256  # When the DB journal gets bigger, the whole DB is written again and it is removed
+config_backup_compression = dv.define_backup_compression_gzip  # See defines for the available options
+config_backups_keep_daily = 7  # Number of days whose backup is kept. The last backup of each day is saved
+config_backups_keep_weekly = 4  # Number of weeks whose newest backup is kept, besides the daily ones
 
 # --------- OTHER -------------
 
@@ -4,6 +4,37 @@
 # --------- ACRONYM SEARCH -------------
 define_regex_acro_find_raw = '[A-ZÁÉÍÓÚÑÇÄËÏÖÜÀÈÌÒÙ]{rep_min_acro_len,}'  # Rep_min_acro_len to be replaced by an int
 
+# Docx reader engines
+define_reader_engine_python_docx = "python-docx"  # Loads the document with the python-docx object model
+define_reader_engine_stream = "stream"  # Streams the document xml from the docx zip file. Faster and less memory
+define_reader_engine_list = [define_reader_engine_python_docx, define_reader_engine_stream]
+
+# Document stories. Part of the document where an acronym was found
+define_story_body = "Body"
+define_story_header = "Header"
+define_story_footer = "Footer"
+define_story_footnote = "Footnote"
+define_story_endnote = "Endnote"
+define_story_comment = "Comment"
+define_story_text_box = "TextBox"
+
+# --------- EXTRACTION CACHE -------------
+define_cache_format_version = 2  # Increase it if the cached results change. Old cache files are not used
+define_cache_file_ext = ".acache"
+define_manifest_file_ext = ".amanifest"
+define_db_sqlite_ext_list = [".sqlite", ".sqlite3", ".db"]  # DB files with these extensions use the SQLite backend
+define_db_journal_ext = ".journal"  # Appended to the DB filename
+define_db_header_size = 64 * 1024  # Bytes read from the DB file to find its save date
+define_db_replica_ext = ".areplica"
+define_db_replica_format_version = 3  # Increase it if the in-memory DB model changes. Old replicas are not used
+
+# DB backup compression methods
+define_backup_compression_none = "none"
+define_backup_compression_gzip = "gzip"
+define_backup_compression_lzma = "lzma"  # Smaller files than gzip, slower to write
+define_backup_compression_ext_dict = {define_backup_compression_none: "", define_backup_compression_gzip: ".gz",
+                                      define_backup_compression_lzma: ".xz"}
+
 # --------- CONTEXT FORMATTING -------------
 define_tb_col_separator = "·|·"        # Used to represent a table column when joining a table row into a single string
 define_new_line_separator = "·(\\n)·"  # Used to represent a line break
@@ -12,3 +12,10 @@ def acro_ordering(input_str):
     output_str = remove_accents(input_str).upper()
     output_str = str(output_str).replace(".", "")  # Remove points for ordering abbreviations
     return output_str
+
+def get_acro_key(input_str):
+    """Returns the key used to find an acronym written differently: without accents, capitalization, points or plural
+    (Ej: ESAs, Ver., ACROÁ -> ESA, VER, ACROA). Empty if nothing is left (Ej: non latin alphabets)"""
+    if len(input_str) > 2 and input_str[-1] == "s" and input_str[-2].isupper():  # Plural of an acronym
+        input_str = input_str[:-1]
+    return remove_accents(input_str).decode("ascii").upper().replace(".", "")
@@ -0,0 +1,97 @@
+import os
+import sys
+import glob
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.common import defines as dv
+from src.common import configVars as cv
+from src.common import pathHelpers
+from src.acroHandlers import acroDictHandler, acroDbHandler
+from src.docxHandlers import docxReader, docxStreamReader
+from src.cmdInterface import cmdProgressBar, userCmdHandler
+
+"""Batch mode. Extracts the acronyms of several docx files in parallel, one process per file, and merges the results
+in one acronym dictionary handler. The DB is only loaded by the main process"""
+
+_worker_obj_db = None  # DB object of the worker process. Only holds the DB special acronyms
+
+
+def get_batch_filepaths(str_batch_path):
+    """Returns the docx files of a folder or matching a glob pattern. Word temporary files ('~$...') are skipped
+
+    :param str_batch_path: Folder path or glob pattern string
+    :return: Sorted list of file paths
+    """
+    if Path(str_batch_path).is_dir():
+        str_batch_path = str(Path(str_batch_path) / "*.docx")
+    return sorted(path for path in glob.glob(str_batch_path)
+                  if Path(path).is_file() and pathHelpers.get_filename_from_path(path)[0] != '~')
+
+
+def extract_acro_batch(acro_dict_handler, str_batch_path, n_jobs=None):
+    """Extracts the acronyms of all the docx files of a folder or glob pattern and stores them in the handler. Each file
+    keeps its filename for the acronyms last uses
+
+    :param acro_dict_handler: Acronym dictionary object. Its DB is shared with the workers
+    :param str_batch_path: Folder path or glob pattern string
+    :param n_jobs: Number of worker processes. If None the number of CPUs is used
+    :return: Number of files processed
+    """
+    list_filepaths = get_batch_filepaths(str_batch_path)
+    # The batch is named after its folder
+    path_folder = Path(str_batch_path) if Path(str_batch_path).is_dir() else Path(str_batch_path).parent
+    acro_dict_handler.str_file_open = pathHelpers.get_filename_from_path(path_folder.resolve())
+    acro_dict_handler.str_file = acro_dict_handler.str_file_open
+    if not list_filepaths:
+        return 0
+
+    n_jobs = min(n_jobs if n_jobs else os.cpu_count(), len(list_filepaths))
+    userCmdHandler.print_batch_search_start(len(list_filepaths), n_jobs)
+
+    # Workers can be spawned instead of forked (Windows), so the configuration is passed explicitly
+    dict_config = {key: value for key, value in vars(cv).items() if key.startswith("config_")}
+    list_results = [None] * len(list_filepaths)
+    obj_progress_bar = cmdProgressBar.CmdProgressBar(len(list_filepaths), userCmdHandler.get_translated_str_files())
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                             initargs=(dict_config, acro_dict_handler.obj_db.list_no_regex)) as executor:
+        dict_futures = {executor.submit(_extract_acro_file, filepath): i for i, filepath in enumerate(list_filepaths)}
+        for n_done, future in enumerate(as_completed(dict_futures)):
+            try:
+                list_results[dict_futures[future]] = future.result()
+            except Exception as e:  # A damaged file should not stop the rest of the batch
+                userCmdHandler.print_batch_file_error(list_filepaths[dict_futures[future]], e)
+            obj_progress_bar.update(n_done + 1)
+
+    # Results are merged in file order, so the output does not depend on which worker finishes first
+    n_files = 0
+    for filepath, result in zip(list_filepaths, list_results):
+        if result is not None:
+            acro_dict_handler.merge_acronyms_found(pathHelpers.get_filename_from_path(filepath), *result)
+            n_files += 1
+    acro_dict_handler.compact_doc_text_arena()
+    return n_files
+
+
+def _init_worker(dict_config, list_no_regex):
+    """Worker process initializer. Sets the main process configuration and the DB special acronyms"""
+    global _worker_obj_db
+    sys.stdout = open(os.devnull, "w")  # Worker progress bars would mix in the console
+    for key, value in dict_config.items():
+        setattr(cv, key, value)
+    _worker_obj_db = acroDbHandler.AcroDbHandler(flag_load=False)
+    _worker_obj_db.set_non_regex_acronyms(list_no_regex)
+
+
+def _extract_acro_file(filepath):
+    """Worker function. Extracts the acronyms of one docx file
+
+    :param filepath: Path string to a docx file
+    :return: Tuple with the acronyms found, the text arena and the document acronym table of the file
+    """
+    acro_dict_handler = acroDictHandler.AcroDictHandler(_worker_obj_db)
+    if cv.config_reader_engine == dv.define_reader_engine_stream:
+        docx_reader = docxStreamReader.DocxStreamReader(acro_dict_handler)
+    else:
+        docx_reader = docxReader.DocxReader(acro_dict_handler)
+    docx_reader.extract_acro_word(filepath)
+    return acro_dict_handler.acros_found, acro_dict_handler.doc_text_arena, acro_dict_handler.acros_doc_table
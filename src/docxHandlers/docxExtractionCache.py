@@ -0,0 +1,205 @@
+import os
+import json
+import zlib
+import hashlib
+from pathlib import Path
+from src.common import defines as dv
+from src.common import configVars as cv
+from src.common import pathHelpers
+from src.acroHandlers import acroTextArena
+
+
+class DocxExtractionCache:
+    """Persistent cache of the acronym extraction results. The key is a hash of the document bytes and of the
+    configuration that changes the results, so a document that has not changed is never parsed again.
+
+    Results are stored as zlib compressed json files. The local folder is the first tier. Optionally the shared folder
+    of the DB is used as a second tier, hits there are copied to the local folder. Each folder is limited in size,
+    the least recently used files are removed first.
+
+    When a document changes, its manifest is used instead. It stores the matches of each text block by the hash of its
+    text, so only the edited blocks have to be searched again. Manifests are only stored in the local folder"""
+    def __init__(self, acro_dict_handler):
+        self.acro_dict_handler = acro_dict_handler
+        self.list_folders = [Path(cv.config_cache_folder)]
+        if cv.config_use_shared_cache:
+            self.list_folders.append(Path(cv.config_acro_db_path).parent / cv.config_cache_shared_rel_folder)
+
+    @staticmethod
+    def get_document_hash(filepath):
+        """Returns the hash of the document bytes. Its cache keys start with it
+
+        :param filepath: Path string to a docx file
+        :return: Hash string
+        """
+        hasher = hashlib.sha256()
+        with open(filepath, 'rb') as docx_file:
+            for chunk in iter(lambda: docx_file.read(1 << 20), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def get_key(self, str_document_hash):
+        """Returns the cache key of a document with the current configuration. Needs the DB special acronyms
+
+        :param str_document_hash: Hash from get_document_hash
+        :return: Key string
+        """
+        str_config_hash = hashlib.sha256(json.dumps(self.__get_config_values(), ensure_ascii=False).encode("utf-8"))
+        return str_document_hash + "_" + str_config_hash.hexdigest()[:32]
+
+    def has_document(self, str_document_hash):
+        """Returns True if there are cached results of a document, with any configuration. The DB is not needed, a
+        document without results can be read while the DB is loaded
+
+        :param str_document_hash: Hash from get_document_hash
+        """
+        return any(next(folder.glob(str_document_hash + "_*" + dv.define_cache_file_ext), None) is not None
+                   for folder in self.list_folders)
+
+    def __get_config_values(self):
+        """Returns the values of everything that can change the extraction results of a document"""
+        list_no_regex = []
+        if cv.config_use_non_matching_acro_from_db:
+            list_no_regex = sorted(self.acro_dict_handler.obj_db.list_no_regex)
+        return [dv.define_cache_format_version, cv.config_regex_acro_find, cv.config_acronym_table_headers,
+                cv.config_use_acro_from_doc_table, list_no_regex, cv.config_max_contexts_per_acro,
+                dv.define_tb_col_separator, dv.define_new_line_separator]
+
+    def load_manifest(self, str_file, list_doc_special):
+        """Returns the block matches stored in the manifest of a document. Empty if there is no valid manifest
+
+        :param str_file: Filename of the document. Identifies the manifest
+        :param list_doc_special: Special acronyms of the document acronym table. They change the matches found
+        :return: Dictionary block text hash -> list of matches, as (start, end) flattened
+        """
+        dict_block_matches = dict()
+        path_manifest = self.list_folders[0] / (self.__get_manifest_name(str_file) + dv.define_manifest_file_ext)
+        try:
+            dict_manifest = json.loads(zlib.decompress(path_manifest.read_bytes()).decode("utf-8"))
+            if dict_manifest['Key'] == self.__get_manifest_key(list_doc_special):
+                dict_block_matches = dict_manifest['Blocks']
+        except (OSError, zlib.error, ValueError, KeyError):  # Not found, not accessible or damaged
+            pass
+        return dict_block_matches
+
+    def has_manifest(self, str_file):
+        """Returns True if a document has a manifest, valid or not. The DB is not needed
+
+        :param str_file: Filename of the document. Identifies the manifest
+        """
+        return (self.list_folders[0] / (self.__get_manifest_name(str_file) + dv.define_manifest_file_ext)).exists()
+
+    def store_manifest(self, str_file, list_doc_special, dict_block_matches):
+        """Stores the manifest of a document, replacing the previous one
+
+        :param str_file: Filename of the document. Identifies the manifest
+        :param list_doc_special: Special acronyms of the document acronym table
+        :param dict_block_matches: Dictionary block text hash -> list of matches, as (start, end) flattened
+        """
+        dict_manifest = {'Key': self.__get_manifest_key(list_doc_special), 'Blocks': dict_block_matches}
+        self.__write(self.list_folders[0], self.__get_manifest_name(str_file), dv.define_manifest_file_ext,
+                     zlib.compress(json.dumps(dict_manifest, separators=(',', ':')).encode("utf-8")))
+
+    def __get_manifest_key(self, list_doc_special):
+        """Returns the key of the configuration the manifest matches were found with"""
+        return hashlib.sha256(json.dumps(self.__get_config_values() + [sorted(list_doc_special)],
+                                         ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def __get_manifest_name(str_file):
+        """Returns the manifest filename, without extension, of a document"""
+        return "manifest_" + hashlib.sha256(str_file.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_block_hash(str_text):
+        """Returns the hash of a block text used in the manifests"""
+        return hashlib.blake2b(str_text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def load(self, str_key):
+        """Loads the cached results of a key into the acronym dictionary handler
+
+        :param str_key: Key from get_key
+        :return: True if the results were found
+        """
+        for i, folder in enumerate(self.list_folders):
+            path_cache = folder / (str_key + dv.define_cache_file_ext)
+            try:
+                cache_data = path_cache.read_bytes()
+                dict_results = json.loads(zlib.decompress(cache_data).decode("utf-8"))
+            except (OSError, zlib.error, ValueError):  # Not found, not accessible or damaged
+                continue
+
+            self.__set_results(dict_results)
+            if i == 0:
+                os.utime(path_cache)  # Mark as recently used
+            else:
+                self.__write(self.list_folders[0], str_key, dv.define_cache_file_ext, cache_data)
+            return True
+        return False
+
+    def store(self, str_key):
+        """Stores the results of the acronym dictionary handler in all the cache folders
+
+        :param str_key: Key from get_key
+        """
+        cache_data = zlib.compress(json.dumps(self.__get_results(), ensure_ascii=False,
+                                              separators=(',', ':')).encode("utf-8"))
+        for folder in self.list_folders:
+            self.__write(folder, str_key, dv.define_cache_file_ext, cache_data)
+
+    def __get_results(self):
+        """Returns the extraction results as a dict of json types. Matches are stored as flat lists of ints"""
+        doc_text_arena = self.acro_dict_handler.doc_text_arena
+        return {
+            'Acronyms': {acro: [acro_found['Count'],
+                                [value for acro_match in acro_found['Matches']
+                                 for value in (acro_match.block_idx, acro_match.start, acro_match.end)]]
+                         for acro, acro_found in self.acro_dict_handler.acros_found.items()},
+            'Stories': doc_text_arena.stories,
+            'Block_texts': doc_text_arena.block_texts,
+            'Block_stories': doc_text_arena.block_story_ids,
+            'Doc_table': self.acro_dict_handler.acros_doc_table,
+            'Doc_table_processed': self.acro_dict_handler.flag_doc_table_processed,
+        }
+
+    def __set_results(self, dict_results):
+        """Sets the extraction results from a dict returned by __get_results"""
+        self.acro_dict_handler.acros_found = dict()
+        for acro, (count, list_values) in dict_results['Acronyms'].items():
+            self.acro_dict_handler.acros_found[acro] = {
+                'Count': count,
+                'Matches': [acroTextArena.AcroMatch(*list_values[i:i + 3]) for i in range(0, len(list_values), 3)]}
+        doc_text_arena = acroTextArena.AcroTextArena()
+        doc_text_arena.stories = dict_results['Stories']
+        doc_text_arena.block_texts = dict_results['Block_texts']
+        doc_text_arena.block_story_ids = dict_results['Block_stories']
+        self.acro_dict_handler.doc_text_arena = doc_text_arena
+        self.acro_dict_handler.acros_doc_table = dict_results['Doc_table']
+        self.acro_dict_handler.flag_doc_table_processed = dict_results['Doc_table_processed']
+
+    @staticmethod
+    def __write(folder, str_name, str_ext, cache_data):
+        """Writes a cache file and removes the least recently used ones if the folder is too big"""
+        try:
+            pathHelpers.ensure_directory(folder)
+            path_cache = folder / (str_name + str_ext)
+            # Written with another name and then renamed, other processes never read a half written file
+            path_tmp = folder / (str_name + ".%d.tmp" % os.getpid())
+            path_tmp.write_bytes(cache_data)
+            os.replace(path_tmp, path_cache)
+
+            list_cache_files = []
+            for str_cache_ext in (dv.define_cache_file_ext, dv.define_manifest_file_ext):
+                for path_file in folder.glob('*' + str_cache_ext):
+                    file_stat = path_file.stat()
+                    list_cache_files.append((file_stat.st_mtime, file_stat.st_size, path_file))
+            list_cache_files.sort()
+            total_size = sum(file_size for mtime, file_size, path_file in list_cache_files)
+            for mtime, file_size, path_file in list_cache_files:
+                if total_size <= cv.config_cache_max_size_mb * 1024 * 1024:
+                    break
+                if path_file != path_cache:
+                    path_file.unlink()
+                    total_size -= file_size
+        except OSError:  # The cache is optional. Folders not accessible (Ej: shared folder offline) are skipped
+            pass
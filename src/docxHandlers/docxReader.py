@@ -1,20 +1,33 @@
 import re
+import bisect
+from concurrent.futures import ThreadPoolExecutor
 import docx
-import lxml
+from docx.opc.part import XmlPart
 from src.common import defines as dv
 from src.common import configVars as cv
 from src.common import pathHelpers
-from src.cmdInterface import ansiColorHelper, cmdProgressBar, userCmdHandler
+from src.acroHandlers import acroSpecialMatcher
+from src.docxHandlers import docxExtractionCache
+from src.docxHandlers import docxXmlHelpers as xh
+from src.cmdInterface import cmdProgressBar, userCmdHandler
 
 
 class DocxReader:
     """Class to process the input document to find its acronyms"""
+    # Document story of the parts with text, by relationship type
+    _dict_part_stories = {xh.RT_HEADER: dv.define_story_header, xh.RT_FOOTER: dv.define_story_footer,
+                          xh.RT_FOOTNOTES: dv.define_story_footnote, xh.RT_ENDNOTES: dv.define_story_endnote,
+                          xh.RT_COMMENTS: dv.define_story_comment}
+
     def __init__(self, acro_dict_handler):
         self.acro_dict_handler = acro_dict_handler
         self.document = None
-        self.full_regex = ""
+        self.full_regex = None
+        self.special_matchers = []  # Matchers for the acronyms that do not match the main regex
 
-        self._doc_namespace = None
+        self._text_blocks = []  # (Story, text) of each document block. Body blocks in document order
+        self._dict_prev_block_matches = None  # Block matches of the previous run (From the manifest). Used if not None
+        self._dict_block_matches = dict()     # Block matches of this run, to store in the manifest
 
     def extract_acro_word(self, filepath, filename_overwrite=None):
         """Main function. Opens a docx file and extracts its acronyms
@@ -23,9 +36,7 @@ class DocxReader:
         :param acro_dict_handler: Acronym dictionary objects
         :param filename_overwrite: String that overwrites the loaded file name stored in the acro handler
         """
-        # 1. Open file
-        self.document = docx.Document(filepath)
-        self._doc_namespace = self.document.element.nsmap
+        # 1. Set filenames
         self.acro_dict_handler.str_file_open = pathHelpers.get_filename_from_path(filepath)
         # Overwrite filename if needed. This is used with the word extensions to keep only one temp file but not lose
         # from which file the acronyms come
@@ -36,153 +47,322 @@ class DocxReader:
 
         userCmdHandler.print_acronym_search_start()
 
-        # 2. Set regex expression
-        # Includes acronyms or abbreviates that do not match with the main regex from the DB or the acronym table
-        # on the document (Ej: ExCOMMS, JdP)
-        main_regex = cv.config_regex_acro_find
+        # 2. Use the previous results if the document was already processed with the same configuration. The key
+        # needs the DB, if it is still being loaded it is only waited for if the document may be cached
+        obj_cache = None
+        if cv.config_use_extraction_cache:
+            obj_cache = docxExtractionCache.DocxExtractionCache(self.acro_dict_handler)
+            str_document_hash = obj_cache.get_document_hash(filepath)
+            if self.acro_dict_handler.is_db_loaded() or obj_cache.has_document(str_document_hash):
+                if obj_cache.load(obj_cache.get_key(str_document_hash)):
+                    userCmdHandler.print_acronym_search_cache_hit()
+                    return
+
+        self._open_document(filepath)
+
+        # 3. Get the text of all document blocks in a single pass. The document acronym table is processed when found
+        self._text_blocks = []
+        self._read_document_blocks()
+
+        # 4. Set regex expression. Needs the acronym table special acronyms
+        self._set_full_regex()
+
+        # 5. Search acronyms in the document using the set regex. Blocks not edited since the last run reuse their
+        # matches from the manifest. Its key needs the DB, if it is still being loaded it is only waited for if the
+        # document has a manifest
+        self._dict_block_matches = dict()
+        if obj_cache is not None:
+            list_doc_special = self._get_doc_table_special_acronyms()
+            if self.acro_dict_handler.is_db_loaded() or obj_cache.has_manifest(self.acro_dict_handler.str_file):
+                self._dict_prev_block_matches = obj_cache.load_manifest(self.acro_dict_handler.str_file,
+                                                                        list_doc_special)
+        self.__extract_acro_from_text_blocks()
+
+        if obj_cache is not None:
+            obj_cache.store_manifest(self.acro_dict_handler.str_file, list_doc_special, self._dict_block_matches)
+            obj_cache.store(obj_cache.get_key(str_document_hash))
+            self._dict_prev_block_matches = None
+            self._dict_block_matches = dict()
+
+    def _open_document(self, filepath):
+        """Opens the docx file with python-docx. Only the xml parts are loaded, images and other media are not read
 
-        brute_regex_list = []
+        :param filepath: Path string to a docx file
+        """
+        self.document = docx.Document(xh.get_text_only_package(filepath))
 
+    def _set_full_regex(self):
+        """Sets the regex and special acronym matchers used to find acronyms. The document acronym table has to be
+        processed before calling this"""
+        self.full_regex = re.compile(cv.config_regex_acro_find)
+
+        # Special acronyms are acronyms or abbreviates that do not match with the main regex, from the DB or the
+        # acronym table on the document (Ej: ExCOMMS, JdP). They have priority, this prevents from finding twice
+        # acronyms like ExCOMMS (ExCOMMS and COMMS). The DB matcher is added in the search, when the DB is needed
+        self.special_matchers = []
         if cv.config_use_acro_from_doc_table:  # Special acronyms from the current document acronym
-            self.__search_and_process_acronym_table()
-            brute_regex_list = [acro_key for acro_key in self.acro_dict_handler.acros_doc_table.keys()
-                                if not re.fullmatch(cv.config_regex_acro_find, acro_key)]
-
-        if cv.config_use_non_matching_acro_from_db:  # Special acronyms from DB
-            brute_regex_list += [acro_key for acro_key in self.acro_dict_handler.obj_db.list_no_regex
-                                 if acro_key not in brute_regex_list]
-
-        # All these words are combined into one big regex. It speeds up drastically the search as only one pass is needed
-        # fixme: probably not the best use of regex, but if not many "special" acronyms it will work flawlessly.
-        brute_regex_list_escaped = [re.escape(acro_key) for acro_key in brute_regex_list]
-        brute_regex = r'|'.join(brute_regex_list_escaped)
-
-        if brute_regex != "":
-            # Add first brute search. This prevents from finding twice acronyms like ExCOMMS (ExCOMMS and COMMS)
-            main_regex = r'\b(' + brute_regex + r')(?![\wÁÉÍÓÚ])|' + main_regex
-            # Last part fixes abbreviates. \b does not match '. ' as both are non alphanumeric
-            # Alternate: r'\b('+second_regex[:-1]+r')(\b|(?=\W))'
-        self.full_regex = main_regex
-
-        # 3. Search acronyms in the document using the set regex
-        self.__extract_acro_from_all_paragraphs()
-        self.__extract_acro_from_all_tables()
-        self.__extract_acro_from_all_sections()
-
-    def __extract_acro_from_all_paragraphs(self):
-        """Iterates through all paragraph blocks of the document and stores all acronyms found"""
-        # Iterate trough all paragraphs
-        obj_progress_bar = cmdProgressBar.CmdProgressBar(len(self.document.paragraphs),
-                                                         userCmdHandler.get_translated_str_paragraphs())
-        for i, paragraph in enumerate(self.document.paragraphs):
-            self.__extract_acro_from_paragraph(paragraph)
-            obj_progress_bar.update(i + 1)
-
-    def __extract_acro_from_all_tables(self):
-        """Iterates through all document tables and stores all acronyms found"""
-        # Iterate trough all table objects
-        obj_progress_bar = cmdProgressBar.CmdProgressBar(len(self.document.tables),
-                                                         userCmdHandler.get_translated_str_tables())
-        for i, table in enumerate(self.document.tables):
-            self.__extract_acro_from_table(table)
-            obj_progress_bar.update(i + 1)
-
-    def __extract_acro_from_all_sections(self):
-        """Iterates through all sections blocks of the document and stores all acronyms found"""
-        # Iterate trough all sections header and footers
-        obj_progress_bar = cmdProgressBar.CmdProgressBar(len(self.document.sections),
-                                                         userCmdHandler.get_translated_str_sections())
-        for i, section in enumerate(self.document.sections):
-            # Headers
-            for paragraph in section.header.paragraphs:
-                self.__extract_acro_from_paragraph(paragraph)
-            for table in section.header.tables:
-                self.__extract_acro_from_table(table)
-
-            # Footers
-            for paragraph in section.footer.paragraphs:
-                self.__extract_acro_from_paragraph(paragraph)
-            for table in section.footer.tables:
-                self.__extract_acro_from_table(table)
-
-            obj_progress_bar.update(i + 1)
-
-    def __extract_acro_from_paragraph(self, paragraph):
-        """Extracts acronyms from a paragraph
-
-        :param paragraph: Paragraph python-docx object
+            self.special_matchers.append(acroSpecialMatcher.AcroSpecialMatcher(self._get_doc_table_special_acronyms()))
+
+    def _get_doc_table_special_acronyms(self):
+        """Returns the acronyms of the document acronym table that do not match the main regex"""
+        return [acro_key for acro_key in self.acro_dict_handler.acros_doc_table.keys()
+                if not re.fullmatch(cv.config_regex_acro_find, acro_key)]
+
+    def _read_document_blocks(self):
+        """Reads the text blocks of the main document body, in document order, and then the ones of the other parts
+        with text: headers, footers, footnotes, endnotes and comments. Each part is read once"""
+        body = self.document.element.body
+        dict_document_rels = dict()
+        dict_parts = dict()
+        for str_rid, rel in self.document.part.rels.items():
+            if not rel.is_external:
+                str_part_name = rel.target_part.partname.lstrip('/')
+                dict_document_rels[str_rid] = (rel.reltype, str_part_name)
+                dict_parts[str_part_name] = rel.target_part
+        list_section_rids = [str_rid for sect_pr in xh.get_body_section_properties(body)
+                             for str_rid in xh.get_section_reference_ids(sect_pr)]
+        list_story_parts = self._get_story_parts(list_section_rids, dict_document_rels)
+
+        # The other parts are independent of the body. They are read by other threads while the body is read. Their
+        # blocks are stored later, in reading order, so the result does not depend on the threads
+        with ThreadPoolExecutor() as executor:
+            list_part_futures = [executor.submit(self.__get_story_part_blocks, dict_parts[str_part_name], str_story)
+                                 for str_part_name, str_story in list_story_parts]
+
+            # Iterate trough all body blocks
+            obj_progress_bar = cmdProgressBar.CmdProgressBar(len(body), userCmdHandler.get_translated_str_document())
+            for i, block_elem in enumerate(body.iterchildren()):
+                self._read_block(block_elem, dv.define_story_body, self._text_blocks, flag_acro_table_search=True)
+                obj_progress_bar.update(i + 1)
+
+            obj_progress_bar = cmdProgressBar.CmdProgressBar(len(list_story_parts),
+                                                             userCmdHandler.get_translated_str_story_parts())
+            for i, future in enumerate(list_part_futures):
+                self._text_blocks += future.result()
+                obj_progress_bar.update(i + 1)
+
+    def __get_story_part_blocks(self, part, str_story):
+        """Returns the text blocks of a part. Called from the worker threads. python-docx only loads the xml of the
+        parts it uses (Ej: headers), the rest are parsed here
+
+        :param part: python-docx part object
+        :param str_story: Document story of the part
+        :return: List of (Story, text) tuples
+        """
+        part_root = part.element if isinstance(part, XmlPart) else xh.parse_part(part.blob)
+        return self._get_story_part_blocks(part_root, str_story)
+
+    @staticmethod
+    def _get_story_parts(list_section_rids, dict_document_rels):
+        """Returns the parts with text other than the main document part, in reading order. First the headers and
+        footers, in the order the sections reference them, and then the footnotes, endnotes and comments
+
+        :param list_section_rids: Relationship ids of the headers and footers referenced by the sections, in order
+        :param dict_document_rels: Relationships of the main document part. Relationship id -> (type, part name)
+        :return: List of (part name, story) tuples
+        """
+        list_story_parts = []
+        set_part_names = set()
+        list_rids = list_section_rids + list(dict_document_rels.keys())  # Not referenced parts at the end
+        for rel_types in ((xh.RT_HEADER, xh.RT_FOOTER), (xh.RT_FOOTNOTES,), (xh.RT_ENDNOTES,), (xh.RT_COMMENTS,)):
+            for str_rid in list_rids:
+                if str_rid in dict_document_rels:
+                    rel_type, str_part_name = dict_document_rels[str_rid]
+                    if rel_type in rel_types and str_part_name not in set_part_names:
+                        set_part_names.add(str_part_name)
+                        list_story_parts.append((str_part_name, DocxReader._dict_part_stories[rel_type]))
+        return list_story_parts
+
+    def _get_story_part_blocks(self, part_root, str_story):
+        """Returns the text blocks of a header, footer, footnotes, endnotes or comments part. The reader is not
+        modified, so it can be called from other threads
+
+        :param part_root: lxml root element of the part
+        :param str_story: Document story of the part
+        :return: List of (Story, text) tuples
+        """
+        text_blocks = []
+        if str_story in (dv.define_story_header, dv.define_story_footer):
+            self._read_story_container(part_root, str_story, text_blocks)
+        else:  # Each footnote, endnote or comment has its own blocks
+            for note_elem in part_root.iterchildren():
+                self._read_story_container(note_elem, str_story, text_blocks)
+        return text_blocks
+
+    def _read_story_container(self, container_elem, str_story, text_blocks):
+        """Stores the text blocks of an element with block content (Ej: Header, footnote, text box)
+
+        :param container_elem: lxml element
+        :param str_story: Document story of the element
+        :param text_blocks: List where the (Story, text) tuples are appended
         """
-        str_accepted_text = self.accepted_text(paragraph, paragraph._p.xml, self._doc_namespace)
-        self.__extract_acro_from_str(str_accepted_text)
+        for block_elem in container_elem.iterchildren():
+            self._read_block(block_elem, str_story, text_blocks)
 
-    def __extract_acro_from_table(self, table):
-        """Extracts acronyms from a table
+    def _read_block(self, block_elem, str_story, text_blocks, flag_acro_table_search=False):
+        """Stores the text blocks of a block level element: paragraphs, tables and the content controls or custom xml
+        elements that contain them. Other elements are skipped
 
-        :param table: Table python-docx object
+        :param block_elem: lxml element
+        :param str_story: Document story of the element
+        :param text_blocks: List where the (Story, text) tuples are appended
+        :param flag_acro_table_search: If True tables are processed as the document acronym table if they match
         """
-        for j, row in enumerate(table.rows):
-            row_cell_list = [self.accepted_text(cell, cell._tc.xml, self._doc_namespace) for cell in row.cells]
-            row_text = dv.define_tb_col_separator.join(row_cell_list)
+        if block_elem.tag == xh.W_P:
+            self.__read_paragraph(block_elem, str_story, text_blocks)
+        elif block_elem.tag == xh.W_TBL:
+            self.__read_table(block_elem, str_story, text_blocks, flag_acro_table_search)
+        elif block_elem.tag in (xh.W_SDT, xh.W_CUSTOM_XML):
+            content_elem = block_elem.find(xh.W_SDT_CONTENT) if block_elem.tag == xh.W_SDT else block_elem
+            if content_elem is not None:
+                for child_elem in content_elem.iterchildren():
+                    self._read_block(child_elem, str_story, text_blocks, flag_acro_table_search)
+
+    def __read_paragraph(self, p_elem, str_story, text_blocks):
+        """Stores the text of a paragraph and then the text of its text boxes
+
+        :param p_elem: lxml paragraph element
+        :param str_story: Document story the paragraph belongs to
+        :param text_blocks: List where the (Story, text) tuples are appended
+        """
+        text_blocks.append((str_story, xh.accepted_text(p_elem)))
+        for txbx_elem in xh.get_text_boxes(p_elem):
+            self._read_story_container(txbx_elem, dv.define_story_text_box, text_blocks)
+
+    def __read_table(self, tbl_elem, str_story, text_blocks, flag_acro_table_search=False):
+        """Stores the text of each table row, followed by the cell content that is not part of the row text (Nested
+        tables, text boxes). If the table is an acronym table its rows are not stored
+
+        :param tbl_elem: lxml table element
+        :param str_story: Document story the table belongs to
+        :param text_blocks: List where the (Story, text) tuples are appended
+        :param flag_acro_table_search: If True the table is processed as the document acronym table if it matches
+        """
+        # Rows and cells are read from the xml, each physical cell once. row.cells follows the layout grid, it is
+        # recomputed for each row and repeats merged cells, so their acronyms were counted several times
+        for j, row_cells in enumerate(xh.table_rows(tbl_elem)):
+            row_text = dv.define_tb_col_separator.join([xh.accepted_text(tc) for tc in row_cells])
 
             # Do not process acronym table as found acronyms
             if j == 0:
-                if self.__is_acronym_table_header(row_text):
+                if self._is_acronym_table_header(row_text):
+                    if flag_acro_table_search and cv.config_use_acro_from_doc_table:
+                        self.__process_acronym_table(tbl_elem)
                     break
 
-            self.__extract_acro_from_str(row_text)
-
-    def __extract_acro_from_str(self, str_in_raw):
-        """Finds acronyms in a text string and stores them into a dictionary
-
-        :param str_in_raw: Input text string
+            text_blocks.append((str_story, row_text))
+            for tc in row_cells:
+                for cell_elem in tc.iterchildren():
+                    if cell_elem.tag == xh.W_P:
+                        for txbx_elem in xh.get_text_boxes(cell_elem):
+                            self._read_story_container(txbx_elem, dv.define_story_text_box, text_blocks)
+                    else:
+                        self._read_block(cell_elem, str_story, text_blocks)
+
+    def __extract_acro_from_text_blocks(self):
+        """Searches acronyms in the text of all stored document blocks. The blocks are joined in one buffer and searched
+        at once, calling the regex per block is slower than the search itself in documents with many short paragraphs.
+        Matches are mapped back to their blocks with the start offset of each block in the buffer"""
+        # Line breaks are removed to reduce space used when outputting the context string to console. Then '\n' is
+        # free to separate the blocks in the buffer: no acronym contains it and it is not a word character, so matches
+        # never cross blocks and the ones at the block edges are the same as searching each block alone
+        list_texts = [str_text.replace('\n', dv.define_new_line_separator) for str_story, str_text in self._text_blocks]
+        list_block_spans = [None] * len(list_texts)
+
+        # 1. Reuse the matches of the blocks that did not change since the manifest was stored
+        list_hashes = None
+        if self._dict_prev_block_matches is not None:
+            list_hashes = [docxExtractionCache.DocxExtractionCache.get_block_hash(str_text) for str_text in list_texts]
+            for i, str_block_hash in enumerate(list_hashes):
+                if str_block_hash in self._dict_prev_block_matches:
+                    list_values = self._dict_prev_block_matches[str_block_hash]
+                    list_block_spans[i] = list(zip(list_values[::2], list_values[1::2]))
+
+        # 2. Find all matches of the rest of blocks in one buffer
+        list_search_idx = [i for i, spans in enumerate(list_block_spans) if spans is None]
+        list_offsets = []
+        idx_offset = 0
+        for i in list_search_idx:
+            list_block_spans[i] = []
+            list_offsets.append(idx_offset)
+            idx_offset += len(list_texts[i]) + 1
+        str_buffer = '\n'.join([list_texts[i] for i in list_search_idx])
+        for idx_start, idx_end in self.__find_acronyms_in_str(str_buffer, self.__iter_special_matchers()):
+            idx_search = bisect.bisect_right(list_offsets, idx_start) - 1
+            idx_offset = list_offsets[idx_search]
+            list_block_spans[list_search_idx[idx_search]].append((idx_start - idx_offset, idx_end - idx_offset))
+        del str_buffer
+
+        for i, ((str_story, str_raw), str_text, spans) in enumerate(zip(self._text_blocks, list_texts,
+                                                                        list_block_spans)):
+            if list_hashes is not None:
+                self._dict_block_matches[list_hashes[i]] = [idx for span in spans for idx in span]
+            if spans:
+                # 3. Save the text for the context shown to the user. Matches only store their position in it
+                block_idx = self.acro_dict_handler.doc_text_arena.add_block(str_story, str_text)
+                for idx_start, idx_end in spans:
+                    self.acro_dict_handler.add_acronym_found(str_text[idx_start:idx_end], block_idx, idx_start,
+                                                             idx_end)
+        self._text_blocks = []  # Only the blocks with acronyms are kept, in the acronym dictionary text arena
+        self.acro_dict_handler.compact_doc_text_arena()
+
+    def __iter_special_matchers(self):
+        """Yields the special acronym matchers, the DB one last. If the DB is being loaded, it is waited for then"""
+        yield from self.special_matchers
+        if cv.config_use_non_matching_acro_from_db:  # Special acronyms from DB. Matcher built when the DB is loaded
+            yield self.acro_dict_handler.obj_db.special_acro_matcher
+
+    def __find_acronyms_in_str(self, str_in, special_matchers):
+        """Finds acronyms in a text string. Special acronyms have priority over the regex ones found at the same
+        position, and the longest special acronym is used. Matches do not overlap
+
+        :param str_in: Input text string
+        :param special_matchers: Iterable with the special acronym matchers. Iterated after the regex search, so the DB
+        can be loaded meanwhile
+        :return: List of (start, end) tuples
         """
         # 1. Find Acronyms as regex matches of groups of N Capital Leters. The regex can be changed for other uses
-        regex_in = self.full_regex
-
-        # Line breaks are removed to reduce space used when outputting the context string to console
-        str_in = str_in_raw.replace('\n', dv.define_new_line_separator)
-        re_results = re.finditer(regex_in, str_in)
-
-        if re_results:
-            # 2. Iterate trough all matches (There could be multiple acronyms in a paragraph)
-            for re_result in re_results:
-                # 3. Save context for user analysis (Only part of the string)
-                context_width = 200
-                # Ensure the context width is achieved
-                prev_context = context_width / 2
-                next_context = context_width / 2
-                # Check if there are unused characters at front/back after adding/subtracting the context. If so, add
-                # them to the opposite side.
-                char_diff_ini = re_result.start(0) - context_width / 2
-                if char_diff_ini < 0:
-                    next_context -= char_diff_ini  # Addition, double negative
-                char_diff_end = len(str_in) - (re_result.start(0) + context_width / 2)
-                if char_diff_end < 0:
-                    prev_context -= char_diff_end  # Addition, double negative
-
-                context_substr_ini = int(max(re_result.start(0) - prev_context, 0))
-                context_substr_end = int(min(re_result.start(0) + next_context, len(str_in)))
-
-                # Context with acronym remarked using ANSI Color Codes
-                str_context = ansiColorHelper.highlight_substr(
-                    str_in[context_substr_ini:context_substr_end],
-                    (re_result.span()[0] - context_substr_ini, re_result.span()[1] - context_substr_ini),
-                    ansiColorHelper.AnsiColorCode.CYAN)
-
-                # 4. Create empty dict if acronym is first found
-                self.acro_dict_handler.add_acronym_found(re_result.group(0), str_context)
-
-    def __search_and_process_acronym_table(self):
-        """ Iterates through all document tables and stores all acronyms found. Processes the acro-table if found"""
-        for table in self.document.tables:
-            row_cell_list = [self.accepted_text(cell, cell._tc.xml, self._doc_namespace) for cell in table.rows[0].cells]
-            row_text = dv.define_tb_col_separator.join(row_cell_list)
-
-            if self.__is_acronym_table_header(row_text):
-                self.__process_acronym_table(table)
-                break  # Do not process other acronym tables. Only one expected
-
-    def __is_acronym_table_header(self, row_input):
+        list_regex_spans = [re_result.span() for re_result in self.full_regex.finditer(str_in)]
+
+        # 2. Find special acronyms. Longest one for each start position
+        dict_special_matches = dict()
+        for special_matcher in special_matchers:
+            for idx_start, idx_end in special_matcher.find_all(str_in).items():
+                if idx_end > dict_special_matches.get(idx_start, -1):
+                    dict_special_matches[idx_start] = idx_end
+        special_starts = sorted(dict_special_matches.keys())
+
+        # 3. Scan from left to right, the first match found is used as if both searches were alternatives of one regex
+        spans = []
+        idx_pos = 0
+        idx_special = 0
+        idx_regex = 0
+        while True:
+            # Skip matches overlapped by the previous one
+            while idx_special < len(special_starts) and special_starts[idx_special] < idx_pos:
+                idx_special += 1
+            while idx_regex < len(list_regex_spans) and list_regex_spans[idx_regex][0] < idx_pos:
+                idx_regex += 1
+            # The next regex match is the next one of the first search, unless a special acronym ended inside the
+            # previous one. Then the regex is searched again from there (Ej: the end of an acronym like ABCdef)
+            if idx_regex > 0 and list_regex_spans[idx_regex - 1][1] > idx_pos:
+                re_result = self.full_regex.search(str_in, idx_pos)
+                regex_span = re_result.span() if re_result is not None else None
+            else:
+                regex_span = list_regex_spans[idx_regex] if idx_regex < len(list_regex_spans) else None
+
+            if idx_special < len(special_starts) and (regex_span is None or
+                                                      special_starts[idx_special] <= regex_span[0]):
+                idx_start = special_starts[idx_special]
+                spans.append((idx_start, dict_special_matches[idx_start]))
+            elif regex_span is not None:
+                spans.append(regex_span)
+            else:
+                break
+            idx_pos = spans[-1][1]
+        return spans
+
+    def _is_acronym_table_header(self, row_input):
         """Checks if the string matches any of the document acronyms table header defined
 
         :param row_input: Header table string
@@ -198,74 +378,63 @@ class DocxReader:
 
         return flag_return
 
-    def __process_acronym_table(self, acro_table):
+    def __process_acronym_table(self, tbl_elem):
         """Processes the document acronym table to extract already defined acronyms. Currently the format is set as:
         Acronym | Definitions as "original text (Translated)" separated by line breaks
 
-        :param acro_table: Python-docx table object
+        :param tbl_elem: lxml table element
         """
         # This function only works if the following format is used:
         # Acronym | Definitions as "original text (Translated)" separated by line breaks
         # When a table is found with a different number of rows it is skiped
         # Todo: Allow for custom tables via configure file
         # Fixme: Prevent crashing if table has merged lines
-        if not self.acro_dict_handler.flag_doc_table_processed and len(acro_table.rows[0].cells) == 2:
-            for row in acro_table.rows[1:]:  # Skipping header (Row 1)
-                # Get raw data
-                acronym = row.cells[0].text.strip()
-                definitions = row.cells[1].text.split('\n')
-
-                if acronym == "":  # Skip empty rows
-                    continue
-
-                # Process definitions
-                for raw_def in definitions:
-                    main_def = raw_def.strip()
-                    trans_def = ""
-
-                    if ')' in main_def:
-                        # Finds the opening and closing parenthesis of the translated part to slice the definition
-                        opening_par = -1
-                        closing_par = main_def.rfind(')')
-                        groups_open = 1  # Group = (). Assumes proper closing of parenthesis
-                        for idx in range(closing_par - 1, 0, -1):
-                            if main_def[idx] == ')':
-                                groups_open += 1
-                            elif main_def[idx] == '(':
-                                groups_open -= 1
-                            if groups_open == 0:
-                                opening_par = idx
-                                break
-                        trans_def = main_def[opening_par + 1:closing_par].strip()
-                        main_def = main_def[:opening_par - 1].strip()
-
-                    self.acro_dict_handler.add_acronym_doc_table(acronym, main_def, trans_def)
+        table_rows = xh.table_grid_rows(tbl_elem)  # Same layout grid as python-docx row.cells
+        if not self.acro_dict_handler.flag_doc_table_processed and len(table_rows[0]) == 2:
+            for row_cells in table_rows[1:]:  # Skipping header (Row 1)
+                self._process_acronym_table_row(xh.cell_text(row_cells[0]), xh.cell_text(row_cells[1]))
         self.acro_dict_handler.flag_doc_table_processed = True
 
+    def _process_acronym_table_row(self, str_acronym_cell, str_definitions_cell):
+        """Processes one row of the document acronym table and stores its definitions
+
+        :param str_acronym_cell: Text of the acronym column
+        :param str_definitions_cell: Text of the definitions column
+        """
+        # Get raw data
+        acronym = str_acronym_cell.strip()
+        definitions = str_definitions_cell.split('\n')
+
+        if acronym != "":  # Skip empty rows
+            # Process definitions
+            for raw_def in definitions:
+                main_def = raw_def.strip()
+                trans_def = ""
+
+                if ')' in main_def:
+                    # Finds the opening and closing parenthesis of the translated part to slice the definition
+                    opening_par = -1
+                    closing_par = main_def.rfind(')')
+                    groups_open = 1  # Group = (). Assumes proper closing of parenthesis
+                    for idx in range(closing_par - 1, 0, -1):
+                        if main_def[idx] == ')':
+                            groups_open += 1
+                        elif main_def[idx] == '(':
+                            groups_open -= 1
+                        if groups_open == 0:
+                            opening_par = idx
+                            break
+                    trans_def = main_def[opening_par + 1:closing_par].strip()
+                    main_def = main_def[:opening_par - 1].strip()
+
+                self.acro_dict_handler.add_acronym_doc_table(acronym, main_def, trans_def)
+
     @staticmethod
-    def accepted_text(docx_elem, docx_elem_xml, doc_nsmap):
+    def accepted_text(docx_elem):
         """Returns text from a word xml section as if it had all changed accepted (From track changes mode).
+        The element tree is used directly, it is not serialized and parsed again
 
-        :param docx_elem: Python-docx object with an element
-        :param docx_elem_xml: Private xml corresponding to the docx_elem variable
-        :param doc_nsmap: Document namespace, for its use by xpath to find tags
-        :return:
+        :param docx_elem: Python-docx object with an element (Paragraph or table cell)
+        :return: Text string
         """
-        str_accepted_text = ""
-        if "w:ins" in docx_elem_xml:
-            target = lxml.etree.XML(docx_elem_xml)
-            # Search all paragraphs in the XML
-            for paragraph in target.xpath('//w:p', namespaces=doc_nsmap):
-                # Search all runs and inserted runs (Track Changes). Deleted runs (w:del) are skipped
-                for text_run in paragraph.xpath('w:r | w:ins/w:r', namespaces=doc_nsmap):
-                    # Handle linebreaks first. It seems that appear in their own run or before text
-                    if text_run.xpath('w:br', namespaces=doc_nsmap):
-                        str_accepted_text += '\n'
-                    for text_tag in text_run.xpath('w:t', namespaces=doc_nsmap):
-                        str_accepted_text += text_tag.text
-                str_accepted_text += '\n'  # Append new line between paragraphs (There can be multiple pgphs in tables)
-            str_accepted_text = str_accepted_text[:-1]  # Remove last paragraph new line char
-        else:
-            # Use python docx when possible as it has the text already extracted
-            str_accepted_text = docx_elem.text
-        return str_accepted_text
+        return xh.accepted_text(docx_elem._element)
@@ -0,0 +1,119 @@
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree
+from src.common import defines as dv
+from src.docxHandlers import docxReader
+from src.docxHandlers import docxXmlHelpers as xh
+from src.cmdInterface import cmdProgressBar, userCmdHandler
+
+
+class DocxStreamReader(docxReader.DocxReader):
+    """Reader engine that streams the document xml directly from the docx zip file with lxml iterparse. The python-docx
+    object model is never built and each body element is cleared after being processed, so memory usage stays low.
+    The text extracted, and so the acronyms found, are the same as with the python-docx engine"""
+    def __init__(self, acro_dict_handler):
+        super().__init__(acro_dict_handler)
+        self._filepath = None
+
+    def _open_document(self, filepath):
+        """Stores the docx file path. The zip file is opened while reading the document blocks
+
+        :param filepath: Path string to a docx file
+        """
+        self._filepath = filepath
+
+    def _read_document_blocks(self):
+        """Streams the main document part storing the text of its body blocks, in document order, and then the text of
+        the other parts with text: headers, footers, footnotes, endnotes and comments. Each part is read once"""
+        with zipfile.ZipFile(self._filepath) as docx_zip:
+            str_document_part = self.__get_main_document_part_name(docx_zip)
+            dict_document_rels = xh.get_part_rels(
+                str_document_part, docx_zip.read(xh.get_rels_part_name(str_document_part)))
+
+            # The other parts are independent of the body. They are read by other threads while the body is streamed.
+            # Their blocks are stored later, in reading order, so the result does not depend on the threads
+            with ThreadPoolExecutor() as executor:
+                dict_part_futures = dict()
+                for str_part_name, str_story in self._get_story_parts([], dict_document_rels):
+                    dict_part_futures[str_part_name] = executor.submit(
+                        self.__get_story_part_blocks, docx_zip.read(str_part_name), str_story)
+
+                list_section_rids = self.__stream_document_part(docx_zip, str_document_part)
+
+                list_story_parts = self._get_story_parts(list_section_rids, dict_document_rels)
+                obj_progress_bar = cmdProgressBar.CmdProgressBar(len(list_story_parts),
+                                                                 userCmdHandler.get_translated_str_story_parts())
+                for i, (str_part_name, str_story) in enumerate(list_story_parts):
+                    self._text_blocks += dict_part_futures[str_part_name].result()
+                    obj_progress_bar.update(i + 1)
+
+    @staticmethod
+    def __get_main_document_part_name(docx_zip):
+        """Returns the main document part name from the package relationships"""
+        str_part_name = "word/document.xml"
+        for rel_type, str_target in xh.get_part_rels("", docx_zip.read("_rels/.rels")).values():
+            if rel_type == xh.RT_OFFICE_DOCUMENT:
+                str_part_name = str_target
+                break
+        return str_part_name
+
+    def __stream_document_part(self, docx_zip, str_part_name):
+        """Streams the main document part storing the text of its body blocks. The document acronym table is
+        processed when found. Elements are freed once processed
+
+        :param docx_zip: Opened ZipFile object
+        :param str_part_name: Name of the main document part
+        :return: Relationship ids of the headers and footers referenced by the sections, in order
+        """
+        list_section_rids = []
+        obj_progress_bar = cmdProgressBar.CmdProgressBar(docx_zip.getinfo(str_part_name).file_size,
+                                                         userCmdHandler.get_translated_str_document())
+        with docx_zip.open(str_part_name) as part_file:
+            obj_progress_reader = _ProgressReader(part_file, obj_progress_bar)
+            # Same parser configuration as python-docx, to get the same text nodes
+            for event, elem in etree.iterparse(obj_progress_reader, events=('end',),
+                                               tag=(xh.W_P, xh.W_TBL, xh.W_SDT, xh.W_CUSTOM_XML, xh.W_SECTPR),
+                                               remove_blank_text=True, resolve_entities=False, huge_tree=True):
+                parent = elem.getparent()
+                # Only blocks directly in the body are processed. Nested ones are processed together with their parent
+                if parent is None or parent.tag != xh.W_BODY:
+                    continue
+
+                if elem.tag == xh.W_SECTPR:  # Last section properties
+                    list_section_rids += xh.get_section_reference_ids(elem)
+                else:
+                    self._read_block(elem, dv.define_story_body, self._text_blocks, flag_acro_table_search=True)
+                    sect_pr = elem.find('w:pPr/w:sectPr', xh.NS_MAP)  # Section breaks are stored in paragraphs
+                    if sect_pr is not None:
+                        list_section_rids += xh.get_section_reference_ids(sect_pr)
+
+                # Free the processed element and the already processed siblings
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del parent[0]
+            obj_progress_bar.update(obj_progress_bar.upper)
+        return list_section_rids
+
+    def __get_story_part_blocks(self, part_xml, str_story):
+        """Parses a part and returns its text blocks. Called from the worker threads
+
+        :param part_xml: Bytes of the part
+        :param str_story: Document story of the part
+        :return: List of (Story, text) tuples
+        """
+        return self._get_story_part_blocks(xh.parse_part(part_xml), str_story)
+
+
+class _ProgressReader:
+    """File-like wrapper that updates a progress bar with the number of bytes read"""
+    def __init__(self, file_obj, obj_progress_bar):
+        self.file_obj = file_obj
+        self.obj_progress_bar = obj_progress_bar
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.file_obj.read(size)
+        self.bytes_read += len(data)
+        if self.bytes_read < self.obj_progress_bar.upper:  # Last update is done when the parsing finishes
+            self.obj_progress_bar.update(self.bytes_read)
+        return data
@@ -0,0 +1,257 @@
+import io
+import zipfile
+from lxml import etree
+
+"""Helpers to extract text directly from WordprocessingML elements (lxml), without the python-docx object model.
+The text functions mimic the python-docx ones used by the DocxReader, so both engines return the same strings."""
+
+# --------- NAMESPACES -------------
+NS_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+NS_MC = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+NS_MAP = {'w': NS_W, 'r': NS_R, 'mc': NS_MC}
+
+RT_OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+RT_HEADER = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/header"
+RT_FOOTER = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/footer"
+RT_FOOTNOTES = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/footnotes"
+RT_ENDNOTES = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/endnotes"
+RT_COMMENTS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/comments"
+
+
+def qn(tag):
+    """Returns the clark notation of a prefixed tag. Ej: 'w:p' -> '{http://...}p'
+
+    :param tag: Prefixed tag string
+    :return: Tag string in clark notation
+    """
+    prefix, local_name = tag.split(':')
+    return "{%s}%s" % (NS_MAP[prefix], local_name)
+
+
+W_BODY = qn('w:body')
+W_P = qn('w:p')
+W_R = qn('w:r')
+W_T = qn('w:t')
+W_TAB = qn('w:tab')
+W_BR = qn('w:br')
+W_CR = qn('w:cr')
+W_TBL = qn('w:tbl')
+W_TR = qn('w:tr')
+W_TC = qn('w:tc')
+W_SECTPR = qn('w:sectPr')
+W_SDT = qn('w:sdt')
+W_SDT_CONTENT = qn('w:sdtContent')
+W_CUSTOM_XML = qn('w:customXml')
+W_HEADER_REFERENCE = qn('w:headerReference')
+W_FOOTER_REFERENCE = qn('w:footerReference')
+W_VAL = qn('w:val')
+W_TYPE = qn('w:type')
+R_ID = qn('r:id')
+
+# Precompiled XPath objects. They are reused for every element
+# The "w:ins" check reproduces the original check, a substring search over the serialized xml, without serializing.
+# That search also catches other tags and attributes starting with "ins" (Ej: w:instrText, w:insideH) and the text
+# "w:ins" in the document text or attribute values
+_xpath_has_ins = etree.XPath(
+    'boolean(descendant-or-self::w:*[starts-with(local-name(), "ins")] | '
+    'descendant-or-self::*/@w:*[starts-with(local-name(), "ins")] | '
+    'descendant-or-self::*/@*[contains(., "w:ins")] | '
+    'descendant-or-self::text()[contains(., "w:ins")])', namespaces=NS_MAP)
+_xpath_text_boxes = etree.XPath('.//w:txbxContent[not(ancestor::mc:Fallback)]', namespaces=NS_MAP)
+_xpath_parent_paragraph = etree.XPath('ancestor::w:p[1]', namespaces=NS_MAP)
+_xpath_body_section_properties = etree.XPath('w:p/w:pPr/w:sectPr | w:sectPr', namespaces=NS_MAP)
+_xpath_grid_cols = etree.XPath('w:tblGrid/w:gridCol', namespaces=NS_MAP)
+_xpath_grid_span = etree.XPath('w:tcPr/w:gridSpan/@w:val', namespaces=NS_MAP)
+_xpath_v_merge = etree.XPath('w:tcPr/w:vMerge', namespaces=NS_MAP)
+
+# Inline elements that contain runs of the paragraph (Ej: Hyperlinks, content controls, inserted text). Deleted text
+# (w:del, w:moveFrom) is not included
+_RUN_CONTAINERS = frozenset(qn(tag) for tag in ('w:hyperlink', 'w:smartTag', 'w:fldSimple', 'w:customXml', 'w:sdt',
+                                                'w:sdtContent', 'w:ins', 'w:moveTo', 'w:dir', 'w:bdo'))
+
+
+def iter_paragraph_runs(p_elem):
+    """Yields the w:r elements of a paragraph, including the ones inside hyperlinks, content controls or inserted
+    text (Track changes), in document order"""
+    for child in p_elem:
+        if child.tag == W_R:
+            yield child
+        elif child.tag in _RUN_CONTAINERS:
+            yield from iter_paragraph_runs(child)
+
+
+def run_text(run_elem):
+    """Returns the text of a w:r element as python-docx does: w:t text, w:tab as '\\t' and w:br or w:cr as '\\n'"""
+    text_parts = []
+    for child in run_elem:
+        if child.tag == W_T:
+            if child.text is not None:
+                text_parts.append(child.text)
+        elif child.tag == W_TAB:
+            text_parts.append('\t')
+        elif child.tag == W_BR or child.tag == W_CR:
+            text_parts.append('\n')
+    return ''.join(text_parts)
+
+
+def paragraph_text(p_elem):
+    """Returns the text of a w:p element as python-docx does, but also with the runs inside hyperlinks and other
+    inline elements"""
+    return ''.join([run_text(run) for run in iter_paragraph_runs(p_elem)])
+
+
+def cell_text(tc_elem):
+    """Returns the text of a w:tc element as python-docx does. Paragraphs are joined with line breaks"""
+    return '\n'.join([paragraph_text(child) for child in tc_elem if child.tag == W_P])
+
+
+def accepted_text(elem):
+    """Returns text from a w:p or w:tc element as if it had all changed accepted (From track changes mode).
+
+    :param elem: lxml element of a paragraph or table cell
+    :return: Text string
+    """
+    if _xpath_has_ins(elem):
+        text_parts = []
+        # Paragraphs of the element. Nested tables and text boxes are read as blocks of their own
+        for paragraph in ([elem] if elem.tag == W_P else elem.iterchildren(W_P)):
+            # Search all runs and inserted runs (Track Changes). Deleted runs (w:del) are skipped
+            for text_run in iter_paragraph_runs(paragraph):
+                # Handle linebreaks first. It seems that appear in their own run or before text
+                if text_run.find(W_BR) is not None:
+                    text_parts.append('\n')
+                for text_tag in text_run.iterchildren(W_T):
+                    if text_tag.text is not None:
+                        text_parts.append(text_tag.text)
+            text_parts.append('\n')  # Append new line between paragraphs (There can be multiple pgphs in tables)
+        str_accepted_text = ''.join(text_parts)[:-1]  # Remove last paragraph new line char
+    elif elem.tag == W_TC:
+        str_accepted_text = cell_text(elem)
+    else:
+        str_accepted_text = paragraph_text(elem)
+    return str_accepted_text
+
+
+def get_text_boxes(p_elem):
+    """Returns the text boxes (w:txbxContent) anchored in a paragraph. The VML copies kept as fallback of the
+    DrawingML text boxes are skipped, so each text box is returned once
+
+    :param p_elem: lxml element of a paragraph
+    :return: List of w:txbxContent elements
+    """
+    return [txbx for txbx in _xpath_text_boxes(p_elem) if _xpath_parent_paragraph(txbx)[0] == p_elem]
+
+
+def get_body_section_properties(body_elem):
+    """Returns the w:sectPr elements of the document body, in document order, as python-docx does"""
+    return _xpath_body_section_properties(body_elem)
+
+
+def get_section_reference_ids(sect_pr):
+    """Returns the relationship ids of the headers and footers of a w:sectPr element. First headers, then footers"""
+    return [ref.get(R_ID) for ref_tag in (W_HEADER_REFERENCE, W_FOOTER_REFERENCE)
+            for ref in sect_pr.iterchildren(ref_tag)]
+
+
+def table_rows(tbl_elem):
+    """Returns the rows of a w:tbl element as lists of its w:tc elements. Each physical cell appears once, merged cells
+    are not repeated and vertically merged cells only have their text in the first row
+
+    :param tbl_elem: lxml element of a table
+    :return: List of rows, each one a list of w:tc elements
+    """
+    return [list(tr.iterchildren(W_TC)) for tr in tbl_elem.iterchildren(W_TR)]
+
+
+def table_grid_rows(tbl_elem):
+    """Returns the rows of a w:tbl element as lists of w:tc elements, following the python-docx layout grid. Merged
+    cells are repeated, once per grid column they span, as python-docx does with row.cells
+
+    :param tbl_elem: lxml element of a table
+    :return: List of rows, each one a list of w:tc elements
+    """
+    col_count = len(_xpath_grid_cols(tbl_elem))
+    cells = []
+    n_rows = 0
+    for tr in tbl_elem.iterchildren(W_TR):
+        n_rows += 1
+        for tc in tr.iterchildren(W_TC):
+            grid_span = _xpath_grid_span(tc)
+            grid_span = int(grid_span[0]) if grid_span else 1
+            v_merge = _xpath_v_merge(tc)
+            flag_v_merge_continue = len(v_merge) > 0 and v_merge[0].get(W_VAL, "continue") == "continue"
+            for grid_span_idx in range(grid_span):
+                if flag_v_merge_continue:
+                    cells.append(cells[-col_count])
+                elif grid_span_idx > 0:
+                    cells.append(cells[-1])
+                else:
+                    cells.append(tc)
+    return [cells[i * col_count:(i + 1) * col_count] for i in range(n_rows)]
+
+
+def parse_part(part_xml):
+    """Parses the xml of a package part with the same parser configuration as python-docx
+
+    :param part_xml: Bytes of the part
+    :return: lxml root element
+    """
+    return etree.fromstring(part_xml, etree.XMLParser(remove_blank_text=True, resolve_entities=False))
+
+
+def get_text_only_package(filepath):
+    """Returns an in memory copy of a docx package with only its xml parts. The other parts (Ej: images, embedded
+    files) are kept with empty content, so the relationships stay valid. Their data is never read from the file
+
+    :param filepath: Path string to a docx file
+    :return: BytesIO object with the package
+    """
+    package_buffer = io.BytesIO()
+    with zipfile.ZipFile(filepath) as docx_zip, zipfile.ZipFile(package_buffer, 'w', zipfile.ZIP_STORED) as text_zip:
+        for zip_info in docx_zip.infolist():
+            if zip_info.filename.endswith(('.xml', '.rels')):
+                text_zip.writestr(zip_info.filename, docx_zip.read(zip_info))
+            else:
+                text_zip.writestr(zip_info.filename, b'')
+    package_buffer.seek(0)
+    return package_buffer
+
+
+def get_part_rels(str_part_name, rels_xml):
+    """Parses a relationships part and returns a dict relationship id -> (type, target part name)
+
+    :param str_part_name: Name of the source part inside the package (Ej: 'word/document.xml')
+    :param rels_xml: Bytes of the .rels part
+    :return: Dictionary with the relationships
+    """
+    dict_rels = dict()
+    base_folder = str_part_name.rpartition('/')[0]
+    for rel in etree.fromstring(rels_xml).iterchildren("{%s}Relationship" % NS_PKG_REL):
+        if rel.get('TargetMode') == 'External':
+            continue
+        dict_rels[rel.get('Id')] = (rel.get('Type'), resolve_part_name(base_folder, rel.get('Target')))
+    return dict_rels
+
+
+def get_rels_part_name(str_part_name):
+    """Returns the name of the relationships part of a package part. Ej: 'word/document.xml' -> 'word/_rels/document.xml.rels'"""
+    folder, sep, filename = str_part_name.rpartition('/')
+    return (folder + '/' if folder else '') + '_rels/' + filename + '.rels'
+
+
+def resolve_part_name(base_folder, str_target):
+    """Resolves a relationship target relative to the source part folder into a package part name"""
+    if str_target.startswith('/'):
+        path_parts = str_target[1:].split('/')
+    else:
+        path_parts = (base_folder.split('/') if base_folder else []) + str_target.split('/')
+    resolved = []
+    for item in path_parts:
+        if item == '..':
+            if resolved:
+                resolved.pop()
+        elif item not in ('', '.'):
+            resolved.append(item)
+    return '/'.join(resolved)
@@ -1,5 +1,6 @@
 import argparse
 import pathlib
+from src.common import defines as dv
 
 
 class ArgvHandler:
@@ -12,14 +13,29 @@ class ArgvHandler:
         parser.add_argument("-i", "--input", type=str, default="", help="Path to word document", required=False)
         parser.add_argument("-m", "--mode", type=str, default="", help="Processing mode", required=False)
         parser.add_argument("-fn", "--filename", type=str, default=None, help="Original filename of document", required=False)
+        parser.add_argument("-e", "--engine", type=str, default=None, choices=dv.define_reader_engine_list,
+                            help="Docx reader engine. Overwrites the configuration file", required=False)
+        parser.add_argument("-b", "--batch", type=str, default="",
+                            help="Folder or glob pattern of word documents to process together", required=False)
+        parser.add_argument("-j", "--jobs", type=int, default=None,
+                            help="Number of processes used in batch mode. Defaults to the number of CPUs", required=False)
+        parser.add_argument("--db-convert", type=str, nargs=2, default=None, metavar=("DB_IN", "DB_OUT"),
+                            help="Converts a DB file between the JSON and SQLite formats and exits", required=False)
         args = parser.parse_args()
 
         # 2. Perform checks
         aux_path = pathlib.Path(args.input)
-        if not aux_path.exists():
+        if args.db_convert is not None:
+            if not pathlib.Path(args.db_convert[0]).exists():
+                exit(-1)
+        elif not aux_path.exists() and args.batch == "":  # Batch patterns are checked when the files are searched
             exit(-1) #Fixme: Raise an exception and only exit on the main script
 
         # 3. Expose arguments
         self.input_path = args.input
         self.mode = args.mode
         self.filename = args.filename
+        self.engine = args.engine
+        self.batch_path = args.batch
+        self.jobs = args.jobs
+        self.db_convert = args.db_convert
@@ -0,0 +1,422 @@
+import unittest
+import tempfile
+import json
+import lzma
+from pathlib import Path
+from src.common import configVars as cv
+from src.common import defines as dv
+from src.acroHandlers import acroSpecialMatcher, acroDictHandler, acroDbHandler, acroDbSqliteHandler, acroAuxObj
+from src.cmdInterface import userCmdHandler
+import sys
+import os
+
+
+class TestAcroSpecialMatcher(unittest.TestCase):
+
+    def setUp(self):
+        sys.stdout = open(os.devnull, "w")  # Redirect standard output to not get prints during testing
+
+    def tearDown(self):
+        sys.stdout = sys.__stdout__
+
+    def test_word_boundaries(self):
+        matcher = acroSpecialMatcher.AcroSpecialMatcher(["ExCOMMS", "Ver.", "JdP"])
+
+        # Acronyms must start at a word boundary and not be followed by a word character
+        str_text = "ExCOMMS, Ver. 2 y JdP. No: xExCOMMS, ExCOMMSa, JdPÁ"
+        self.assertEqual({0: 7, 9: 13, 18: 21}, matcher.find_all(str_text))
+
+    def test_longest_match(self):
+        matcher = acroSpecialMatcher.AcroSpecialMatcher(["Ver", "Ver.", "Ver.2"])
+
+        self.assertEqual({0: 5}, matcher.find_all("Ver.2"))
+        self.assertEqual({0: 4}, matcher.find_all("Ver. 2"))
+        self.assertEqual({0: 3}, matcher.find_all("Ver"))
+
+    def test_empty_matcher(self):
+        matcher = acroSpecialMatcher.AcroSpecialMatcher()
+
+        self.assertEqual(0, len(matcher))
+        self.assertEqual({}, matcher.find_all("ExCOMMS"))
+
+
+class TestAcroDictHandler(unittest.TestCase):
+
+    def setUp(self):
+        sys.stdout = open(os.devnull, "w")  # Redirect standard output to not get prints during testing
+        self.max_contexts_per_acro = cv.config_max_contexts_per_acro
+
+    def tearDown(self):
+        sys.stdout = sys.__stdout__
+        cv.config_max_contexts_per_acro = self.max_contexts_per_acro
+
+    def __add_matches(self, n_matches):
+        acro_dict_handler = acroDictHandler.AcroDictHandler()
+        for i in range(n_matches):
+            block_idx = acro_dict_handler.doc_text_arena.add_block("Body", "Texto %d con ACRO" % i)
+            idx_start = len("Texto %d con " % i)
+            acro_dict_handler.add_acronym_found("ACRO", block_idx, idx_start, idx_start + len("ACRO"))
+        acro_dict_handler.compact_doc_text_arena()
+        return acro_dict_handler
+
+    def test_bounded_contexts(self):
+        cv.config_max_contexts_per_acro = 10
+        acro_dict_handler = self.__add_matches(1000)
+
+        # Count is exact, the number of stored contexts is limited and the first matches are always kept
+        self.assertEqual(1000, acro_dict_handler.acros_found["ACRO"]['Count'])
+        self.assertEqual(10, len(acro_dict_handler.get_acronym_contexts("ACRO")))
+        self.assertEqual(990, acro_dict_handler.get_acronym_omitted_count("ACRO"))
+        self.assertEqual(10, len(acro_dict_handler.doc_text_arena.block_texts))
+        list_matches = acro_dict_handler.get_acronym_matches("ACRO")
+        self.assertEqual([0, 1, 2, 3, 4], [acro_match.block_idx for acro_match in list_matches[:5]])
+        self.assertEqual(["ACRO"] * 10, [acro_dict_handler.doc_text_arena.get_acronym(acro_match)
+                                         for acro_match in list_matches])
+
+        # Same matches stored on every run
+        self.assertEqual(acro_dict_handler.get_acronym_contexts("ACRO"),
+                         self.__add_matches(1000).get_acronym_contexts("ACRO"))
+
+    def test_unbounded_contexts(self):
+        cv.config_max_contexts_per_acro = 0
+        acro_dict_handler = self.__add_matches(100)
+
+        self.assertEqual(100, len(acro_dict_handler.get_acronym_contexts("ACRO")))
+        self.assertEqual(0, acro_dict_handler.get_acronym_omitted_count("ACRO"))
+
+
+class TestAcroDbHandler(unittest.TestCase):
+
+    def setUp(self):
+        sys.stdout = open(os.devnull, "w")  # Redirect standard output to not get prints during testing
+        self.acro_db_path = cv.config_acro_db_path
+        self.acro_db_layer_paths = cv.config_acro_db_layer_paths
+        self.cache_folder = cv.config_cache_folder
+        self.db_journal_max_size_kb = cv.config_db_journal_max_size_kb
+        self.use_db_journal = cv.config_use_db_journal
+        self.save_backups = cv.config_save_backups
+        self.backup_config = (cv.config_backup_compression, cv.config_backups_keep_daily, cv.config_backups_keep_weekly)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        cv.config_acro_db_path = str(Path(self.temp_dir.name) / "db.json")
+        cv.config_cache_folder = str(Path(self.temp_dir.name) / "cache")
+        Path(cv.config_acro_db_path).write_text(json.dumps({
+            'Acronyms': {"ACRO": {'Def': [{'Main': "Acrónimo"}], 'Properties': {
+                'Creation': "01/01/2023 00:00:00", 'Last_edit': "01/01/2023 00:00:00", 'Last_uses': []}}},
+            'Blacklist': [],
+            'Admin_data': {'Date': "01/01/2023 00:00:00 000000"}}), encoding="utf-8")
+
+    def tearDown(self):
+        sys.stdout = sys.__stdout__
+        cv.config_acro_db_path = self.acro_db_path
+        cv.config_acro_db_layer_paths = self.acro_db_layer_paths
+        cv.config_cache_folder = self.cache_folder
+        cv.config_db_journal_max_size_kb = self.db_journal_max_size_kb
+        cv.config_use_db_journal = self.use_db_journal
+        cv.config_save_backups = self.save_backups
+        cv.config_backup_compression, cv.config_backups_keep_daily, cv.config_backups_keep_weekly = self.backup_config
+        self.temp_dir.cleanup()
+
+    def test_journal(self):
+        cv.config_use_db_journal = True
+        bytes_db = Path(cv.config_acro_db_path).read_bytes()
+        path_journal = acroDbHandler.get_journal_path(cv.config_acro_db_path)
+        obj_db = acroDbHandler.AcroDbHandler()
+        self.assertFalse(obj_db.is_dirty())
+
+        # Changes are appended to the journal, the DB file is not written
+        obj_db.update_acro_in_db("NEW", [{'Main': "Nuevo"}])
+        obj_db.toggle_in_blacklist("ID")
+        self.assertTrue(obj_db.is_dirty())
+        obj_db.save_db(cv.config_acro_db_path)
+        self.assertEqual(bytes_db, Path(cv.config_acro_db_path).read_bytes())
+        self.assertTrue(path_journal.exists())
+
+        obj_db = acroDbHandler.AcroDbHandler()
+        self.assertEqual([{'Main': "Nuevo"}], obj_db.search_def_in_db("NEW"))
+        self.assertTrue(obj_db.is_blacklisted("ID"))
+        self.assertTrue(obj_db.check_db_integrity())
+
+        # Compaction. The journal is folded into the DB file
+        cv.config_db_journal_max_size_kb = 0
+        obj_db.delete_acro_in_db("ACRO")
+        obj_db.save_db(cv.config_acro_db_path)
+        self.assertFalse(path_journal.exists())
+        obj_db = acroDbHandler.AcroDbHandler()
+        self.assertEqual(["NEW"], list(obj_db.acros_db))
+        self.assertEqual({"ID"}, obj_db.full_db['Blacklist'])
+
+    def test_integrity_check(self):
+        obj_db = acroDbHandler.AcroDbHandler()
+        self.assertTrue(obj_db.check_db_integrity())
+
+        # Modification time changed, same content
+        os.utime(cv.config_acro_db_path, ns=(0, 0))
+        self.assertTrue(obj_db.check_db_integrity())
+
+        # The DB file loaded is checked, even if the configured one changed after the load
+        str_db_path = cv.config_acro_db_path
+        cv.config_acro_db_path = str(Path(self.temp_dir.name) / "other.json")
+        self.assertTrue(obj_db.check_db_integrity())
+        cv.config_acro_db_path = str_db_path
+
+        # Saved by other user. The DB file is written again with the admin data first
+        cv.config_db_journal_max_size_kb = 0
+        obj_db_other = acroDbHandler.AcroDbHandler()
+        obj_db_other.update_acro_in_db("NEW", [{'Main': "Nuevo"}])
+        obj_db_other.save_db(cv.config_acro_db_path)
+        self.assertTrue(Path(cv.config_acro_db_path).read_text(encoding="utf-8").startswith('{\n  "Admin_data": {'))
+        self.assertEqual(acroDbHandler.dumps_db(obj_db_other.full_db),
+                         Path(cv.config_acro_db_path).read_text(encoding="utf-8"))
+        self.assertFalse(obj_db.check_db_integrity())
+        self.assertTrue(acroDbHandler.AcroDbHandler().check_db_integrity())
+
+    def test_integrity_check_long_changelog(self):
+        cv.config_db_journal_max_size_kb = 0
+        obj_db = acroDbHandler.AcroDbHandler()
+        for i in range(10000):
+            obj_db.update_acro_in_db("ACRO%d" % i, [{'Main': "Acrónimo %d" % i}])
+        obj_db.save_db(cv.config_acro_db_path)
+        self.assertGreater(len(json.dumps(obj_db.full_db['Admin_data']['Changelog'])), dv.define_db_header_size)
+
+        # The date is read from the header. The rest of the file is not read, it could not be parsed
+        obj_db = acroDbHandler.AcroDbHandler()
+        with open(cv.config_acro_db_path, 'r+b') as db_file:
+            db_file.truncate(dv.define_db_header_size + 1)
+        self.assertTrue(obj_db.check_db_integrity())
+
+    def test_merge(self):
+        obj_db = acroDbHandler.AcroDbHandler()
+        obj_db_other = acroDbHandler.AcroDbHandler()
+        obj_db_other.update_acro_in_db("ACRO", [{'Main': "Otra definición"}])
+        obj_db_other.update_acro_in_db("OTHER", [{'Main': "Otro"}])
+        obj_db_other.update_acro_in_db("BOTH", [{'Main': "Suyo"}])
+        obj_db_other.save_db(cv.config_acro_db_path)
+
+        # Changes in different acronyms and new last uses are merged. Only BOTH is a conflict
+        list_conflicts = []
+
+        def resolve_conflict(acro, acro_data_ours, acro_data_theirs):
+            list_conflicts.append(acro)
+            return acro_data_ours
+
+        obj_db.add_db_last_use("ACRO", "doc.docx")
+        obj_db.update_acro_in_db("NEW", [{'Main': "Nuevo"}])
+        obj_db.update_acro_in_db("BOTH", [{'Main': "Mío"}])
+        obj_db.toggle_in_blacklist("ID")
+        self.assertFalse(obj_db.check_db_integrity())
+        self.assertTrue(obj_db.merge_db_changes(resolve_conflict))
+        self.assertEqual(["BOTH"], list_conflicts)
+        self.assertTrue(obj_db.check_db_integrity())
+        obj_db.save_db(cv.config_acro_db_path)
+
+        obj_db = acroDbHandler.AcroDbHandler()
+        self.assertEqual(["ACRO", "BOTH", "NEW", "OTHER"], sorted(obj_db.acros_db))
+        self.assertEqual([{'Main': "Otra definición"}], obj_db.search_def_in_db("ACRO"))
+        self.assertEqual([{'Main': "Mío"}], obj_db.search_def_in_db("BOTH"))
+        self.assertEqual("doc.docx", obj_db.acros_db["ACRO"].last_uses[-1][0])
+        self.assertTrue(obj_db.is_blacklisted("ID"))
+
+    def test_replica(self):
+        acroDbHandler.AcroDbHandler()
+        self.assertEqual(1, len(list(Path(cv.config_cache_folder).iterdir())))
+
+        # While the DB file size and modification time do not change, it is not read again
+        path_db = Path(cv.config_acro_db_path)
+        db_stat = path_db.stat()
+        bytes_db = path_db.read_bytes()
+        path_db.write_bytes(bytes_db.replace(b"ACRO", b"ABCD"))
+        os.utime(path_db, ns=(db_stat.st_atime_ns, db_stat.st_mtime_ns))
+        self.assertEqual(["ACRO"], list(acroDbHandler.AcroDbHandler().acros_db))
+
+        os.utime(path_db, ns=(0, 0))
+        self.assertEqual(["ABCD"], list(acroDbHandler.AcroDbHandler().acros_db))
+
+    def test_blacklist_duplicates(self):
+        full_db = json.loads(Path(cv.config_acro_db_path).read_text(encoding="utf-8"))
+        full_db['Blacklist'] = ["ID", "OK", "ID"]
+        Path(cv.config_acro_db_path).write_text(json.dumps(full_db), encoding="utf-8")
+        obj_db = acroDbHandler.AcroDbHandler()
+        obj_db.toggle_in_blacklist("ID")
+        self.assertFalse(obj_db.is_blacklisted("ID"))
+
+        # Saved with the JSON layout
+        cv.config_db_journal_max_size_kb = 0
+        obj_db.toggle_in_blacklist("ID")
+        obj_db.save_db(cv.config_acro_db_path)
+        full_db = json.loads(Path(cv.config_acro_db_path).read_text(encoding="utf-8"))
+        self.assertEqual(["ID", "OK"], full_db['Blacklist'])
+        self.assertEqual([{'Main': "Acrónimo"}], full_db['Acronyms']["ACRO"]['Def'])
+
+    def test_save_only_last_uses(self):
+        cv.config_save_backups = True
+        bytes_db = Path(cv.config_acro_db_path).read_bytes()
+        path_bak_folder = Path(cv.config_acro_db_path).parent / cv.config_acro_db_bkp_rel_folder
+
+        # Review run without changes. Only the last uses are new, nothing is saved
+        acro_dict_handler = acroDictHandler.AcroDictHandler()
+        acro_dict_handler.update_acro_output("ACRO", [{'Main': "Acrónimo"}], [True])
+        acro_dict_handler.mark_acro_output_as_used()
+        self.assertFalse(acro_dict_handler.obj_db.is_dirty())
+        userCmdHandler.handle_db_save(acro_dict_handler)
+        self.assertEqual(bytes_db, Path(cv.config_acro_db_path).read_bytes())
+        self.assertFalse(path_bak_folder.exists())
+
+        # With other changes, the last uses are saved too
+        acro_dict_handler.obj_db.update_acro_in_db("NEW", [{'Main': "Nuevo"}])
+        userCmdHandler.handle_db_save(acro_dict_handler)
+        obj_db = acroDbHandler.AcroDbHandler()
+        self.assertEqual([{'Main': "Nuevo"}], obj_db.search_def_in_db("NEW"))
+        self.assertEqual(1, len(obj_db.acros_db["ACRO"].last_uses))
+        self.assertTrue(path_bak_folder.exists())
+
+    def test_reload_during_background_load(self):
+        path_db_b = Path(self.temp_dir.name) / "db_b.json"
+        path_db_b.write_text(json.dumps({'Acronyms': {"BBB": {'Def': [{'Main': "Otra"}]}}, 'Blacklist': [],
+                                         'Admin_data': {'Date': "01/01/2023 00:00:00 000000"}}), encoding="utf-8")
+        acro_dict_handler = acroDictHandler.AcroDictHandler(flag_background_load=True)
+
+        # The DB path is changed before the background load is used. Its DB is never used instead of the new one
+        cv.config_acro_db_path = str(path_db_b)
+        acro_dict_handler.load_db()
+        self.assertTrue(acro_dict_handler.is_db_loaded())
+        self.assertEqual(["BBB"], list(acro_dict_handler.obj_db.acros_db))
+
+    def test_similar_acros(self):
+        obj_db = acroDbHandler.AcroDbHandler()
+        obj_db.update_acro_in_db("ESA", [{'Main': "Agencia Espacial Europea"}])
+        self.assertEqual(["ACRO"], obj_db.search_similar_acros_in_db("Acró."))
+        self.assertEqual(["ESA"], obj_db.search_similar_acros_in_db("ESAs"))
+        self.assertEqual([], obj_db.search_similar_acros_in_db("ESA"))
+
+        # The definitions of the similar acronym are only proposed if accepted. Editing them does not change it
+        aux_acro_obj = acroAuxObj.AcroAuxObj("ESAs", acroDictHandler.AcroDictHandler(obj_db))
+        self.assertEqual({"ESA": [{'Main': "Agencia Espacial Europea"}]}, aux_acro_obj.dict_similar_defs)
+        self.assertTrue(aux_acro_obj.has_only_similar_defs())
+        self.assertEqual([{'Main': ""}], aux_acro_obj.proposed_def)
+        aux_acro_obj.use_similar_defs("ESA")
+        self.assertEqual([{'Main': "Agencia Espacial Europea"}], aux_acro_obj.proposed_def)
+        aux_acro_obj.edit_def(1, "Agencias Espaciales Europeas", "")
+        self.assertEqual([{'Main': "Agencia Espacial Europea"}], obj_db.search_def_in_db("ESA"))
+
+        obj_db.delete_acro_in_db("ESA")
+        self.assertEqual([], obj_db.search_similar_acros_in_db("ESAs"))
+
+    def test_db_layers(self):
+        path_company_db = Path(self.temp_dir.name) / "company.json"
+        path_company_db.write_text(json.dumps({
+            'Acronyms': {"ACRO": {'Def': [{'Main': "Acrónimo de empresa"}], 'Properties': {
+                'Creation': "01/01/2023 00:00:00", 'Last_edit': "01/01/2023 00:00:00", 'Last_uses': []}},
+                         "ESA": {'Def': [{'Main': "Agencia Espacial Europea"}], 'Properties': {
+                'Creation': "01/01/2023 00:00:00", 'Last_edit': "01/01/2023 00:00:00", 'Last_uses': []}}},
+            'Blacklist': ["TBD"],
+            'Admin_data': {'Date': "01/01/2023 00:00:00 000000"}}), encoding="utf-8")
+        bytes_company_db = path_company_db.read_bytes()
+        cv.config_acro_db_layer_paths = [str(path_company_db)]
+        obj_db = acroDictHandler.AcroDictHandler().obj_db
+
+        # The DB is searched first, then its layers
+        self.assertEqual([{'Main': "Acrónimo"}], obj_db.search_def_in_db("ACRO"))
+        self.assertEqual([{'Main': "Agencia Espacial Europea"}], obj_db.search_def_in_db("ESA"))
+        self.assertEqual(["ESA"], obj_db.search_similar_acros_in_db("ESAs"))
+        self.assertTrue(obj_db.is_blacklisted("TBD"))
+        self.assertFalse(obj_db.toggle_in_blacklist("TBD"))
+        self.assertFalse(obj_db.delete_acro_in_db("ESA"))
+
+        # Changes are only written to the DB
+        obj_db.update_acro_in_db("ESA", [{'Main': "European Space Agency"}])
+        obj_db.save_db(cv.config_acro_db_path)
+        self.assertEqual(bytes_company_db, path_company_db.read_bytes())
+        obj_db = acroDictHandler.AcroDictHandler().obj_db
+        self.assertEqual([{'Main': "European Space Agency"}], obj_db.search_def_in_db("ESA"))
+        self.assertEqual([{'Main': "Agencia Espacial Europea"}], obj_db.list_db_layers[0].search_def_in_db("ESA"))
+
+    def test_backups(self):
+        obj_db = acroDbHandler.AcroDbHandler()
+        bak_folder = Path(self.temp_dir.name) / "backup"
+        bak_folder.mkdir()
+        cv.config_backup_compression = "lzma"
+        obj_db.save_db_backup(bak_folder / "db_backup(20260106).json.xz")
+        self.assertEqual(Path(cv.config_acro_db_path).read_bytes(),
+                         lzma.decompress((bak_folder / "db_backup(20260106).json.xz").read_bytes()))
+
+        # Retention: 2 days and the newest backup of 2 weeks. Only snapshots used by the kept deltas remain
+        cv.config_backups_keep_daily = 2
+        cv.config_backups_keep_weekly = 2
+        for str_name in ["db_backup(20251220).json", "db_backup(20251220)_1.json",
+                         "db_backup(20251228)_bbbb.json.journal", "db_backup(20260106)_aaaa.json.journal",
+                         "db_backup(20260102).json.gz", "db_backup(20260103).json.gz", "db_backup(20260105).json.gz",
+                         "db_snapshot(aaaa).json.xz", "db_snapshot(bbbb).json.xz", "other_backup(20200101).json"]:
+            (bak_folder / str_name).write_bytes(b"")
+        self.assertEqual(5, obj_db.prune_backups(bak_folder, "db"))
+        self.assertEqual(["db_backup(20260103).json.gz", "db_backup(20260105).json.gz",
+                          "db_backup(20260106).json.xz", "db_backup(20260106)_aaaa.json.journal",
+                          "db_snapshot(aaaa).json.xz", "other_backup(20200101).json"], sorted(path.name for path in bak_folder.iterdir()))
+
+    def test_stale_journal_ignored(self):
+        # Journal written for other version of the DB file
+        acroDbHandler.get_journal_path(cv.config_acro_db_path).write_text(
+            '["Snapshot", "Other date"]\n["Delete", "ACRO"]\n', encoding="utf-8")
+        obj_db = acroDbHandler.AcroDbHandler()
+        self.assertEqual(["ACRO"], list(obj_db.acros_db))
+
+
+class TestAcroDbSqliteHandler(unittest.TestCase):
+
+    def setUp(self):
+        sys.stdout = open(os.devnull, "w")  # Redirect standard output to not get prints during testing
+        self.acro_db_path = cv.config_acro_db_path
+        self.cache_folder = cv.config_cache_folder
+        self.temp_dir = tempfile.TemporaryDirectory()
+        cv.config_cache_folder = str(Path(self.temp_dir.name) / "cache")
+        self.path_json = Path(self.temp_dir.name) / "db.json"
+        self.path_json.write_text(json.dumps({
+            'Acronyms': {"ACRO": {'Def': [{'Main': "Acrónimo"}], 'Properties': {
+                'Creation': "01/01/2023 00:00:00", 'Last_edit': "01/01/2023 00:00:00", 'Last_uses': []}},
+                         "Ver.": {'Def': [{'Main': "Versión"}]}},
+            'Blacklist': ["ID", "ID"],
+            'Admin_data': {'Date': "01/01/2023 00:00:00 000000"}}), encoding="utf-8")
+        cv.config_acro_db_path = str(Path(self.temp_dir.name) / "db.sqlite")
+
+    def tearDown(self):
+        sys.stdout = sys.__stdout__
+        cv.config_acro_db_path = self.acro_db_path
+        cv.config_cache_folder = self.cache_folder
+        self.temp_dir.cleanup()
+
+    def test_import_edit_export(self):
+        acroDbSqliteHandler.convert_db(str(self.path_json), cv.config_acro_db_path)
+        obj_db = acroDictHandler.AcroDictHandler().obj_db
+        self.assertIsInstance(obj_db, acroDbSqliteHandler.AcroDbSqliteHandler)
+        self.assertEqual(cv.config_acro_db_path, obj_db.str_db_path)
+        # Rollback journal, the DB can be shared by several PCs
+        self.assertEqual("delete", obj_db.conn.execute("PRAGMA journal_mode").fetchone()[0])
+        self.assertEqual(["Ver."], obj_db.list_no_regex)
+        self.assertEqual([{'Main': "Acrónimo"}], obj_db.search_def_in_db("ACRO"))
+        self.assertTrue(obj_db.is_blacklisted("ID"))
+
+        # Changes are only written on save
+        obj_db.update_acro_in_db("NEW", [{'Main': "Nuevo"}])
+        obj_db.delete_acro_in_db("Ver.")
+        obj_db.toggle_in_blacklist("ID")
+        obj_db.add_db_last_use("ACRO", "doc.docx")
+        self.assertEqual([], acroDbSqliteHandler.AcroDbSqliteHandler().search_def_in_db("NEW"))
+        self.assertTrue(obj_db.check_db_integrity())
+        obj_db.save_db(cv.config_acro_db_path)
+        self.assertFalse(obj_db.check_db_integrity())
+
+        obj_db = acroDbSqliteHandler.AcroDbSqliteHandler()
+        self.assertEqual([{'Main': "Nuevo"}], obj_db.search_def_in_db("NEW"))
+        self.assertEqual([], obj_db.search_def_in_db("Ver."))
+        self.assertFalse(obj_db.is_blacklisted("ID"))
+
+        path_json_out = Path(self.temp_dir.name) / "db_out.json"
+        acroDbSqliteHandler.convert_db(cv.config_acro_db_path, str(path_json_out))
+        full_db = json.loads(path_json_out.read_text(encoding="utf-8"))
+        self.assertEqual(["ACRO", "NEW"], sorted(full_db['Acronyms']))
+        self.assertEqual("doc.docx", full_db['Acronyms']["ACRO"]['Properties']['Last_uses'][0][0])
+        self.assertEqual([], full_db['Blacklist'])
+        self.assertEqual(["NEW"], full_db['Admin_data']['Changelog']['Added'])
+
+
+if __name__ == '__main__':
+    unittest.main()
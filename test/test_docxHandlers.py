@@ -1,7 +1,12 @@
 import unittest
+import tempfile
+import docx
+from pathlib import Path
+from src.common import defines as dv
+from src.common import configVars as cv
 from src.common import stringHelpers as strHlprs
 from src.acroHandlers import acroDictHandler
-from src.docxHandlers import docxReader
+from src.docxHandlers import docxReader, docxStreamReader, docxBatchReader
 import sys
 import os
 
@@ -24,9 +29,13 @@ class TestDocxMethods(unittest.TestCase):
         self.len_acros_expected = len(self.acros_expected)
 
         sys.stdout = open(os.devnull, "w")  # Redirect standard output to not get prints during testing
+        # Cached results would hide the reader behaviour. Only enabled in the cache test
+        self.flag_use_extraction_cache = cv.config_use_extraction_cache
+        cv.config_use_extraction_cache = False
 
     def tearDown(self):
         sys.stdout = sys.__stdout__
+        cv.config_use_extraction_cache = self.flag_use_extraction_cache
 
     def test_no_acronyms(self):
         acro_dict_handler = acroDictHandler.AcroDictHandler()
@@ -95,6 +104,195 @@ class TestDocxMethods(unittest.TestCase):
         # Check if more acros than expected are found
         self.assertEqual(len(self.acros_expected), len(acro_dict_handler.acros_found.keys()))
 
+    def test_acronym_stories(self):
+        acro_dict_handler = acroDictHandler.AcroDictHandler()
+        docx_reader = docxReader.DocxReader(acro_dict_handler)
+        docx_reader.extract_acro_word(self.docx_test)
+
+        # Each match stores the document story where it was found
+        expected_stories = {"ACROINPAR": dv.define_story_body, "ACROTBSIMPLE": dv.define_story_body,
+                            "ACROHEADER": dv.define_story_header, "ACROFOOTER": dv.define_story_footer}
+        for acro, str_story in expected_stories.items():
+            acro_stories = acro_dict_handler.get_acronym_stories(acro)
+            self.assertEqual(acro_dict_handler.acros_found[acro]['Count'], len(acro_stories))
+            self.assertEqual({str_story}, set(acro_stories))
+
+    def test_stream_engine_same_results(self):
+        # Both reader engines must find the same acronyms, with the same counts and contexts. Both read the story parts
+        # in threads, a document with several sections has a header and a footer part for each one
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        docx_sections = str(Path(temp_dir.name) / "doc_sections.docx")
+        document = docx.Document()
+        for i in range(8):
+            section = document.sections[0] if i == 0 else document.add_section()
+            section.header.is_linked_to_previous = False
+            section.footer.is_linked_to_previous = False
+            section.header.paragraphs[0].text = "Cabecera ACROHEADER%d y ACROSHARED" % i
+            section.footer.paragraphs[0].text = "Pie ACROFOOTER%d y ACROSHARED" % i
+            document.add_paragraph("Sección ACROSECTION%d" % i)
+        document.save(docx_sections)
+
+        for docx_test in [self.docx_test, "doc_no_acronyms.docx", "doc_testing_no_acro_tb.docx",
+                          "doc_testing_stories.docx", docx_sections]:
+            acro_dict_handler = acroDictHandler.AcroDictHandler()
+            docx_reader = docxReader.DocxReader(acro_dict_handler)
+            docx_reader.extract_acro_word(docx_test)
+
+            acro_dict_handler_stream = acroDictHandler.AcroDictHandler()
+            docx_stream_reader = docxStreamReader.DocxStreamReader(acro_dict_handler_stream)
+            docx_stream_reader.extract_acro_word(docx_test)
+
+            self.assertEqual(acro_dict_handler.acros_found.keys(), acro_dict_handler_stream.acros_found.keys())
+            for acro in acro_dict_handler.acros_found:
+                self.assertEqual(acro_dict_handler.acros_found[acro]['Count'],
+                                 acro_dict_handler_stream.acros_found[acro]['Count'])
+                self.assertEqual(acro_dict_handler.get_acronym_contexts(acro),
+                                 acro_dict_handler_stream.get_acronym_contexts(acro))
+                self.assertEqual(acro_dict_handler.get_acronym_stories(acro),
+                                 acro_dict_handler_stream.get_acronym_stories(acro))
+            self.assertEqual(acro_dict_handler.acros_doc_table, acro_dict_handler_stream.acros_doc_table)
+            self.assertEqual(acro_dict_handler.doc_text_arena.block_texts,
+                             acro_dict_handler_stream.doc_text_arena.block_texts)
+
+        # Story parts in reading order: the headers and footers in the order of their sections
+        self.assertEqual(["Cabecera ACROHEADER%d y ACROSHARED" % i for i in range(8)],
+                         [str_text for str_text in acro_dict_handler.doc_text_arena.block_texts
+                          if str_text.startswith("Cabecera")])
+        self.assertEqual(16, acro_dict_handler.acros_found["ACROSHARED"]['Count'])
+
+    def test_all_stories(self):
+        # Acronyms in every text part and in content python-docx does not expose must be found once, with their story
+        dict_stories_expected = {
+            "ACROBODY": dv.define_story_body, "ACROHYPERLINK": dv.define_story_body, "ACROCELL": dv.define_story_body,
+            "ACRONESTED": dv.define_story_body, "ACROSDT": dv.define_story_body,
+            "ACROTEXTBOX": dv.define_story_text_box, "ACROFOOTNOTE": dv.define_story_footnote,
+            "ACROENDNOTE": dv.define_story_endnote, "ACROCOMMENT": dv.define_story_comment}
+        for reader_class in [docxReader.DocxReader, docxStreamReader.DocxStreamReader]:
+            acro_dict_handler = acroDictHandler.AcroDictHandler()
+            reader_class(acro_dict_handler).extract_acro_word("doc_testing_stories.docx")
+
+            self.assertEqual(dict_stories_expected.keys(), acro_dict_handler.acros_found.keys())
+            for acro, str_story in dict_stories_expected.items():
+                self.assertEqual([str_story], acro_dict_handler.get_acronym_stories(acro))
+
+    def test_merged_cells_counted_once(self):
+        # Merged table cells are repeated by the python-docx layout grid. Their acronyms must be counted once
+        for reader_class in [docxReader.DocxReader, docxStreamReader.DocxStreamReader]:
+            acro_dict_handler = acroDictHandler.AcroDictHandler()
+            reader_class(acro_dict_handler).extract_acro_word(self.docx_test)
+            for acro in ["ACROTBCOMBINEDONE", "ACROTBCOMBINEDTWO", "ACROTBCOMBINEDTHREE"]:
+                self.assertEqual(1, acro_dict_handler.acros_found[acro]['Count'])
+
+    def test_batch_extraction(self):
+        list_docx_test = [self.docx_test, "doc_testing_no_acro_tb.docx", "doc_testing_stories.docx"]
+        acro_dict_handler = acroDictHandler.AcroDictHandler()
+        self.assertEqual(3, docxBatchReader.extract_acro_batch(acro_dict_handler, "doc_testing*.docx", n_jobs=2))
+
+        # The batch result must be the same as processing each file alone, and keep in which files each acronym is
+        dict_counts = dict()
+        dict_files = dict()
+        dict_contexts = dict()
+        for docx_test in list_docx_test:
+            acro_dict_handler_file = acroDictHandler.AcroDictHandler()
+            docx_reader = docxReader.DocxReader(acro_dict_handler_file)
+            docx_reader.extract_acro_word(docx_test)
+            for acro, acro_found in acro_dict_handler_file.acros_found.items():
+                dict_counts[acro] = dict_counts.get(acro, 0) + acro_found['Count']
+                dict_files.setdefault(acro, []).append(docx_test)
+                dict_contexts.setdefault(acro, []).extend(acro_dict_handler_file.get_acronym_contexts(acro))
+
+        self.assertEqual(dict_counts, {acro: acro_found['Count']
+                                       for acro, acro_found in acro_dict_handler.acros_found.items()})
+        self.assertEqual(dict_files, acro_dict_handler.dict_acro_files)
+        self.assertEqual(dict_contexts, {acro: acro_dict_handler.get_acronym_contexts(acro)
+                                         for acro in acro_dict_handler.acros_found})
+
+    def test_extraction_cache(self):
+        cache_folder = cv.config_cache_folder
+        cache_max_size_mb = cv.config_cache_max_size_mb
+        with tempfile.TemporaryDirectory() as temp_folder:
+            cv.config_use_extraction_cache = True
+            cv.config_cache_folder = temp_folder
+            try:
+                acro_dict_handler = acroDictHandler.AcroDictHandler()
+                docxReader.DocxReader(acro_dict_handler).extract_acro_word(self.docx_test)
+                self.assertEqual(1, len(list(Path(temp_folder).glob("*" + dv.define_cache_file_ext))))
+
+                # A hit does not open the document and gives the same results
+                acro_dict_handler_cached = acroDictHandler.AcroDictHandler()
+                docx_reader = docxReader.DocxReader(acro_dict_handler_cached)
+                docx_reader.extract_acro_word(self.docx_test)
+                self.assertIsNone(docx_reader.document)
+                self.assertEqual(acro_dict_handler.acros_doc_table, acro_dict_handler_cached.acros_doc_table)
+                self.assertEqual(acro_dict_handler.acros_found.keys(), acro_dict_handler_cached.acros_found.keys())
+                for acro in acro_dict_handler.acros_found:
+                    self.assertEqual(acro_dict_handler.acros_found[acro]['Count'],
+                                     acro_dict_handler_cached.acros_found[acro]['Count'])
+                    self.assertEqual(acro_dict_handler.get_acronym_contexts(acro),
+                                     acro_dict_handler_cached.get_acronym_contexts(acro))
+
+                # Least recently used results are removed when the folder is too big
+                cv.config_cache_max_size_mb = 0
+                docxReader.DocxReader(acroDictHandler.AcroDictHandler()).extract_acro_word("doc_no_acronyms.docx")
+                self.assertEqual(1, len(list(Path(temp_folder).glob("*" + dv.define_cache_file_ext))))
+            finally:
+                cv.config_cache_folder = cache_folder
+                cv.config_cache_max_size_mb = cache_max_size_mb
+
+    def test_background_db_load(self):
+        cache_folder = cv.config_cache_folder
+        with tempfile.TemporaryDirectory() as temp_folder:
+            cv.config_cache_folder = temp_folder
+            try:
+                acro_dict_handler = acroDictHandler.AcroDictHandler()
+                docxReader.DocxReader(acro_dict_handler).extract_acro_word(self.docx_test)
+
+                # Document not cached, it is read while the DB is loaded. Then a hit with the DB loaded in background
+                cv.config_use_extraction_cache = True
+                for i in range(2):
+                    acro_dict_handler_background = acroDictHandler.AcroDictHandler(flag_background_load=True)
+                    docxReader.DocxReader(acro_dict_handler_background).extract_acro_word(self.docx_test)
+                    self.assertEqual(acro_dict_handler.acros_found.keys(),
+                                     acro_dict_handler_background.acros_found.keys())
+                    self.assertEqual(acro_dict_handler.obj_db.list_no_regex,
+                                     acro_dict_handler_background.obj_db.list_no_regex)
+                self.assertEqual(1, len(list(Path(temp_folder).glob("*" + dv.define_cache_file_ext))))
+            finally:
+                cv.config_cache_folder = cache_folder
+
+    def test_extraction_manifest(self):
+        cache_folder = cv.config_cache_folder
+        with tempfile.TemporaryDirectory() as temp_folder:
+            cv.config_cache_folder = temp_folder
+            try:
+                # Edited version of the document, with the same filename
+                path_edited = Path(temp_folder) / "edited" / self.docx_test
+                path_edited.parent.mkdir()
+                document = docx.Document(self.docx_test)
+                document.paragraphs[0].text = "Párrafo editado con ACRONEW y ACROONCE"
+                document.add_paragraph("Párrafo nuevo con ACROREPEAT")
+                document.save(str(path_edited))
+
+                acro_dict_handler = acroDictHandler.AcroDictHandler()
+                docxReader.DocxReader(acro_dict_handler).extract_acro_word(str(path_edited))
+
+                # The manifest of the original document is used for the unchanged blocks
+                cv.config_use_extraction_cache = True
+                docxReader.DocxReader(acroDictHandler.AcroDictHandler()).extract_acro_word(self.docx_test)
+                acro_dict_handler_manifest = acroDictHandler.AcroDictHandler()
+                docxReader.DocxReader(acro_dict_handler_manifest).extract_acro_word(str(path_edited))
+
+                self.assertIn("ACRONEW", acro_dict_handler_manifest.acros_found)
+                self.assertEqual(acro_dict_handler.acros_found.keys(), acro_dict_handler_manifest.acros_found.keys())
+                for acro in acro_dict_handler.acros_found:
+                    self.assertEqual(acro_dict_handler.acros_found[acro]['Count'],
+                                     acro_dict_handler_manifest.acros_found[acro]['Count'])
+                    self.assertEqual(acro_dict_handler.get_acronym_contexts(acro),
+                                     acro_dict_handler_manifest.get_acronym_contexts(acro))
+            finally:
+                cv.config_cache_folder = cache_folder
+
 
 if __name__ == '__main__':
     unittest.main()